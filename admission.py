@@ -0,0 +1,79 @@
+import math
+import os
+import threading
+
+class Overloaded(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after, message="Túl sok várakozó ellenőrzés, próbálja újra később"):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class MemoryPressure(Overloaded):
+    # A böngészők együtt a közös memóriakorlát felett vannak; új munka nem indul
+    status_code = 503
+
+    def __init__(self, retry_after):
+        super().__init__(retry_after, "A böngészők memóriahasználata a korlát felett van, próbálja újra később")
+
+class AdmissionControl:
+    # Korlátos munkasor: a várakozó és futó ellenőrzések száma legfeljebb max_pending;
+    # ha betelt, az új kérés azonnal elutasítást kap a várható várakozási idővel.
+    # A memory_check() igaz értékénél (memóriakorlát felett) sem indul új ellenőrzés.
+    def __init__(self, max_pending=100, capacity=1, initial_estimate=30.0, memory_check=None, memory_retry_after=10):
+        self.max_pending = max_pending
+        self.capacity = max(1, capacity)
+        self.memory_check = memory_check
+        self.memory_retry_after = memory_retry_after
+        self.pending = 0
+        self.rejected = 0
+        self.memory_rejected = 0
+        self.average_seconds = initial_estimate
+        self.lock = threading.Lock()
+
+    def check_memory(self):
+        if self.memory_check and self.memory_check():
+            with self.lock:
+                self.memory_rejected += 1
+            raise MemoryPressure(self.memory_retry_after)
+
+    def admit(self, count):
+        if not count:
+            return
+        self.check_memory()
+        if not self.max_pending:
+            return
+        with self.lock:
+            if self.pending + count > self.max_pending:
+                self.rejected += 1
+                raise Overloaded(self._retry_after())
+            self.pending += count
+
+    def release(self, seconds=None):
+        with self.lock:
+            if self.max_pending:
+                self.pending = max(0, self.pending - 1)
+            if seconds is not None:
+                # Exponenciálisan simított átlag az ellenőrzések idejéről
+                self.average_seconds = 0.8 * self.average_seconds + 0.2 * seconds
+
+    def _retry_after(self):
+        return max(1, math.ceil(self.average_seconds * self.pending / self.capacity))
+
+    def stats(self):
+        with self.lock:
+            return {
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "rejected": self.rejected,
+                "memory_rejected": self.memory_rejected,
+                "average_check_seconds": round(self.average_seconds, 2)
+            }
+
+def create_admission_control(capacity, memory_check=None):
+    return AdmissionControl(
+        max_pending=int(os.getenv("CHECK_QUEUE_SIZE", "100")),
+        capacity=capacity,
+        memory_check=memory_check,
+        memory_retry_after=int(os.getenv("MEMORY_RETRY_AFTER", "10"))
+    )
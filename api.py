@@ -1,8 +1,29 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Optional
-from playwright.sync_api import sync_playwright
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional, Tuple
+from skype_reader import SkypeReader as BaseSkypeReader, ensure_browser_installed
+from browser_pool import BrowserPool
+from worker_pool import WorkerPool
+from resource_governor import create_resource_governor
+from admission import Overloaded, create_admission_control
+from deadline import Deadline
+from session_store import create_session_store
+from request_filter import create_request_filter, total_report
+from selector_stats import get_selector_stats
+from result_cache import create_result_cache
+from history_store import create_history_store
+from scheduler import StatsScheduler
+from jobs import JobStore, JobStoreFull, describe
+from singleflight import SingleFlight
+from change_notifier import ChangeNotifier
+import compact_response
+import metrics
+from concurrent.futures import Future, TimeoutError, as_completed
+import hashlib
+import json
 import os
+import threading
 import time
 
 app = FastAPI(title="Skype Üzenet Statisztika API")
@@ -17,198 +38,59 @@ class SkypeStats(BaseModel):
     unread_messages: int
     oldest_unread_date: Optional[str] = None
     error: Optional[str] = None
+    # 'fresh' (most lekérve), 'cached' vagy 'stale' (gyorsítótárból), és az eredmény kora
+    cache_status: Optional[str] = None
+    age_seconds: Optional[float] = None
+    # Beszélgetésenként (azonosító, olvasatlan, utolsó üzenet ISO ideje); csak a tömör
+    # válaszformátumok adják vissza, a hagyományos JSON válaszban nem szerepel
+    conversations: Optional[List[Tuple[str, int, Optional[str]]]] = Field(default=None, exclude=True)
 
-class SkypeReader:
-    def __init__(self):
-        self.playwright = sync_playwright().start()
-        self.setup_browser()
-        
-    def setup_browser(self):
-        try:
-            # Böngésző indítása headless módban
-            self.browser = self.playwright.chromium.launch(
-                headless=True,  # Headless mód bekapcsolása
-                args=[
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-extensions',
-                    '--disable-notifications',
-                    '--disable-gpu',  # GPU kikapcsolása headless módban
-                    '--window-size=1920,1080',
-                    '--disable-setuid-sandbox',
-                    '--single-process',  # Egyetlen folyamat használata
-                    '--no-zygote',  # Zygote process kikapcsolása
-                    '--disable-accelerated-2d-canvas',  # 2D gyorsítás kikapcsolása
-                    '--disable-web-security',  # Biztonsági korlátozások kikapcsolása
-                    '--disable-features=IsolateOrigins,site-per-process'  # Process isolation kikapcsolása
-                ]
-            )
-            
-            # Új kontextus létrehozása egyedi beállításokkal
-            self.context = self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-                ignore_https_errors=True,
-                java_script_enabled=True,
-                bypass_csp=True,
-                extra_http_headers={
-                    'Accept-Language': 'hu-HU,hu;q=0.9,en-US;q=0.8,en;q=0.7'
-                }
-            )
-            
-            # Új oldal létrehozása
-            self.page = self.context.new_page()
-            self.page.set_default_timeout(120000)  # Timeout növelése 120 másodpercre
-            
-            # JavaScript kód injektálása az automatizálás elrejtéséhez
-            self.page.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-            """)
-            
-        except Exception as e:
-            print(f"Hiba a böngésző inicializálása során: {str(e)}")
-            raise
-        
-    def login(self, username, password):
-        try:
-            print("Skype weboldal betöltése...")
-            self.page.goto("https://web.skype.com", wait_until="networkidle", timeout=120000)
-            time.sleep(10)
-            
-            print("Várakozás a bejelentkezési mezőre...")
-            self.page.wait_for_selector('input[name="loginfmt"]', timeout=120000)
-            print("Email cím megadása...")
-            self.page.fill('input[name="loginfmt"]', username)
-            time.sleep(2)
-            
-            print("Következő gomb kattintása...")
-            self.page.click('#idSIButton9')
-            time.sleep(5)
-            
-            print("Várakozás a jelszó mezőre...")
-            self.page.wait_for_selector('input[name="passwd"]', timeout=120000)
-            print("Jelszó megadása...")
-            self.page.fill('input[name="passwd"]', password)
-            time.sleep(2)
-            
-            print("Bejelentkezés gomb kattintása...")
-            self.page.click('#idSIButton9')
-            time.sleep(5)
-            
-            print("Várakozás a 'Bejelentkezve maradás' ablakra...")
-            try:
-                time.sleep(10)
-                checkbox = self.page.wait_for_selector('[name="DontShowAgain"]', timeout=30000)
-                if checkbox:
-                    print("Checkbox megtalálva, kattintás...")
-                    checkbox.click()
-                    time.sleep(2)
-                    self.page.keyboard.press('Enter')
-                    time.sleep(10)
-            except:
-                print("Nem található 'Bejelentkezve maradás' ablak")
-            
-            print("Várakozás a főoldal betöltésére...")
-            time.sleep(30)
-            
-            # Várjuk meg, hogy a chat lista megjelenjen
-            print("Chat lista keresése...")
-            chat_list = None
-            retry_count = 0
-            max_retries = 3
-            
-            while retry_count < max_retries:
-                try:
-                    chat_list = self.page.wait_for_selector('div[role="list"]', timeout=60000)
-                    if chat_list:
-                        print("Chat lista megtalálva")
-                        break
-                except:
-                    print(f"Chat lista nem található, újrapróbálkozás ({retry_count + 1}/{max_retries})...")
-                    self.page.reload(wait_until="networkidle", timeout=120000)
-                    time.sleep(20)
-                    retry_count += 1
-            
-            if not chat_list:
-                print("Nem található chat lista")
-                return False
-                
-            print("Oldal frissítése és várakozás a chat elemekre...")
-            self.page.reload(wait_until="networkidle", timeout=120000)
-            time.sleep(20)
-            
-            # Várjuk meg, hogy legalább egy chat elem megjelenjen
-            try:
-                print("Chat elemek keresése...")
-                chat_items = self.page.wait_for_selector('div[role="listitem"]', timeout=60000)
-                if chat_items:
-                    print("Chat elemek megtalálva")
-                    time.sleep(10)  # Várunk még, hogy minden elem betöltődjön
-            except:
-                print("Nem találhatók chat elemek")
-                return False
-            
-            return True
-            
-        except Exception as e:
-            print(f"Hiba történt a bejelentkezés során: {str(e)}")
-            return False
-            
-    def get_message_stats(self):
-        try:
-            print("Várakozás a beszélgetések betöltésére...")
-            time.sleep(20)
-            
-            # Próbáljuk meg többször is lekérni a chat elemeket
-            retry_count = 0
-            max_retries = 3
-            debug_info = None
-            
-            while retry_count < max_retries:
-                # HTML tartalom mentése debuggoláshoz
-                html_content = self.page.content()
-                with open(f'debug_page_{retry_count}.html', 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-                print(f"HTML tartalom elmentve a debug_page_{retry_count}.html fájlba")
-                
-                # JavaScript kód futtatása
-                print(f"JavaScript kód futtatása (próbálkozás {retry_count + 1}/{max_retries})...")
-                debug_info = self.page.evaluate(self.get_messages_js_code())
-                
-                # Debug információk mentése fájlba
-                with open(f'debug_info_{retry_count}.json', 'w', encoding='utf-8') as f:
-                    f.write(str(debug_info))
-                print(f"Debug információk elmentve a debug_info_{retry_count}.json fájlba")
-                
-                if debug_info and debug_info['totalChats'] > 0:
-                    print(f"Sikeresen találtunk {debug_info['totalChats']} chat elemet")
-                    break
-                
-                print("Nem találtunk chat elemeket, újrapróbálkozás...")
-                self.page.reload(wait_until="networkidle", timeout=120000)
-                time.sleep(20)
-                retry_count += 1
-            
-            if not debug_info or debug_info['totalChats'] == 0:
-                print("Nem sikerült chat elemeket találni")
-                return None
-            
-            return {
-                "total_messages": debug_info['totalChats'],
-                "unread_messages": debug_info['unreadCount'],
-                "oldest_unread_date": debug_info['oldestUnreadDate']
-            }
-            
-        except Exception as e:
-            print(f"Hiba történt az üzenetek lekérdezése során: {str(e)}")
-            return None
-            
+class AccountStatus(BaseModel):
+    email: str
+    stats: Optional[SkypeStats] = None
+    last_refresh: Optional[float] = None
+    last_duration_seconds: Optional[float] = None
+    age_seconds: Optional[float] = None
+    next_refresh_in_seconds: Optional[float] = None
+    refreshing: bool = False
+    last_error: Optional[str] = None
+    refresh_count: int = 0
+
+class JobRequest(BaseModel):
+    # Üres lista nem lehet: annak a feladata sosem zárulna le, és nem is törlődne
+    accounts: List[SkypeCredentials] = Field(min_length=1)
+    callback_url: Optional[str] = None
+    concurrency: Optional[int] = None
+    # Másodpercben; ennyi idő után a még el nem készült fiókok hibával zárulnak
+    deadline: Optional[float] = None
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    total: int
+    completed: int
+    created_at: float
+    finished_at: Optional[float] = None
+    callback_status: Optional[str] = None
+    emails: List[str]
+    results: List[Optional[SkypeStats]]
+
+class SkypeReader(BaseSkypeReader):
+    # Az API bővebb olvasatlan-jelző listát használ, mint a parancssoros olvasó
+    UNREAD_INDICATORS = [
+        '[role="status"]',
+        '.css-1dbjc4n.r-1awozwy.r-1mlx99i.r-1867qdf.r-1yadl64.r-1777fci.r-285fr0.r-s1qlax',
+        '.css-901oao.r-jwli3a.r-1bhw0zn.r-10x49cs.r-b88u0q.r-1cwl3u0',
+        '.css-1dbjc4n.r-1awozwy.r-1mlx99i.r-1867qdf.r-1yadl64.r-1777fci.r-285fr0',
+        '.css-901oao.r-jwli3a.r-1bhw0zn.r-10x49cs.r-b88u0q',
+        '[aria-label*="olvasatlan"]',
+        '[aria-label*="unread"]'
+    ]
+    LENIENT_INDICATORS = True
+    
     def get_messages_js_code(self):
         return """
-        () => {
+        (config) => {
             // Keressük a chat elemeket
             const chatItems = Array.from(document.querySelectorAll('div[role="listitem"]'));
             console.log('Talált chat elemek száma:', chatItems.length);
@@ -221,12 +103,14 @@ class SkypeReader:
             chatItems.forEach((item, index) => {
                 const itemInfo = {
                     index,
+                    id: item.getAttribute('data-id') || item.id || String(index),
                     classes: item.className,
                     text: item.textContent,
                     hasUnread: false,
                     unreadCount: 0,
                     date: null,
-                    fullDate: null
+                    fullDate: null,
+                    hits: []
                 };
                 
                 // Keressük a dátumot az aria-label attribútumból
@@ -239,7 +123,8 @@ class SkypeReader:
                     const timeMatch = ariaLabel.match(/(\d{1,2}:\d{2})/);
                     
                     // Keressük a mai/tegnapi/stb. jelzőket is
-                    const dayMatch = ariaLabel.match(/(ma|tegnap|tegnapelőtt)/i);
+                    // A hosszabb alak előbb, és csak önálló szóként (a 'ma' ne illeszkedjen pl. a 'Tamás'-ban)
+                    const dayMatch = ariaLabel.match(/(?<![a-záéíóöőúüű])(tegnapelőtt|tegnap|ma)(?![a-záéíóöőúüű])/i);
                     
                     if (fullDateMatch) {
                         // Ha van teljes dátum
@@ -297,15 +182,8 @@ class SkypeReader:
                 }
                 
                 // Keressük az olvasatlan üzenet jelzőket
-                const unreadIndicators = [
-                    '[role="status"]',  // Elsődleges jelző
-                    '.css-1dbjc4n.r-1awozwy.r-1mlx99i.r-1867qdf.r-1yadl64.r-1777fci.r-285fr0.r-s1qlax',  // Alternatív jelző 1
-                    '.css-901oao.r-jwli3a.r-1bhw0zn.r-10x49cs.r-b88u0q.r-1cwl3u0',  // Alternatív jelző 2
-                    '.css-1dbjc4n.r-1awozwy.r-1mlx99i.r-1867qdf.r-1yadl64.r-1777fci.r-285fr0',  // Új jelző 1
-                    '.css-901oao.r-jwli3a.r-1bhw0zn.r-10x49cs.r-b88u0q',  // Új jelző 2
-                    '[aria-label*="olvasatlan"]',  // Magyar nyelvű jelző
-                    '[aria-label*="unread"]'  // Angol nyelvű jelző
-                ];
+                // A szelektorok listáját és sorrendjét a hívó adja (lásd selector_stats.py)
+                const unreadIndicators = config.selectors;
                 
                 // Keressük az olvasatlan üzenet jelzőket
                 for (const selector of unreadIndicators) {
@@ -332,6 +210,7 @@ class SkypeReader:
                             const count = parseInt(text);
                             if (!isNaN(count) && count > 0) {
                                 itemInfo.hasUnread = true;
+                                if (!itemInfo.hits.includes(selector)) itemInfo.hits.push(selector);
                                 itemInfo.unreadCount = count;
                                 unreadCount = Math.max(unreadCount, count);
                                 
@@ -357,6 +236,7 @@ class SkypeReader:
                             // Ha nincs szám, de van szöveg (pl. "olvasatlan")
                             else if (text && (text.toLowerCase().includes('olvasatlan') || text.toLowerCase().includes('unread'))) {
                                 itemInfo.hasUnread = true;
+                                if (!itemInfo.hits.includes(selector)) itemInfo.hits.push(selector);
                                 itemInfo.unreadCount = 1;  // Feltételezzük, hogy 1 olvasatlan üzenet van
                                 unreadCount = Math.max(unreadCount, 1);
                                 
@@ -372,85 +252,634 @@ class SkypeReader:
                             }
                         }
                     });
+                    // Adaptív sorrendnél az első találó szelektor után nem próbáljuk a többit
+                    if (config.firstHit && itemInfo.hits.length) break;
                 }
                 
                 results.push(itemInfo);
             });
             
+            const selectorHits = {};
+            for (const itemInfo of results) {
+                for (const selector of itemInfo.hits) selectorHits[selector] = (selectorHits[selector] || 0) + 1;
+            }
+            
             return {
                 totalChats: chatItems.length,
                 unreadCount,
                 oldestUnreadDate,
-                details: results
+                details: results,
+                selectorHits
             };
         }
         """
-    
-    def close(self):
-        print("Böngésző bezárása...")
-        self.context.close()
-        self.browser.close()
-        self.playwright.stop()
 
-@app.post("/check-messages", response_model=List[SkypeStats])
-def check_messages(credentials: List[SkypeCredentials]):
-    results = []
-    
-    for cred in credentials:
-        reader = None
-        try:
-            print(f"Bejelentkezés a következő fiókkal: {cred.email}")
-            reader = SkypeReader()
-            
-            login_success = reader.login(cred.email, cred.password)
-            if login_success:
-                stats = reader.get_message_stats()
-                if stats:
-                    oldest_date = None
-                    if stats['oldest_unread_date']:
-                        if isinstance(stats['oldest_unread_date'], dict):
-                            oldest_date = stats['oldest_unread_date']['text']
-                        else:
-                            oldest_date = stats['oldest_unread_date']
-                    
-                    results.append(SkypeStats(
-                        email=cred.email,
-                        total_messages=stats['total_messages'],
-                        unread_messages=stats['unread_messages'],
-                        oldest_unread_date=oldest_date
-                    ))
-                else:
-                    results.append(SkypeStats(
-                        email=cred.email,
-                        total_messages=0,
-                        unread_messages=0,
-                        error="Nem sikerült lekérni a statisztikákat"
-                    ))
-            else:
-                results.append(SkypeStats(
+browser_pool = None
+session_store = create_session_store()
+result_cache = create_result_cache()
+# Induláskor jön létre, hogy a munkafolyamatok ne nyissák meg az adatbázist
+history_store = None
+job_store = JobStore(
+    max_jobs=int(os.getenv("JOB_STORE_MAX_JOBS", "1000")),
+    ttl=float(os.getenv("JOB_STORE_TTL", "3600"))
+)
+scheduler = None
+# Ugyanarra a fiókra egyszerre csak egy ellenőrzés fut, a többi hívó csatlakozik hozzá
+in_flight = SingleFlight()
+# Regisztrált fiókok olvasatlan-állapotának változásai a long-poll kérésekhez
+changes = ChangeNotifier()
+LONG_POLL_MAX = float(os.getenv("LONG_POLL_MAX", "60"))
+
+worker_pool = None
+admission = None
+# Egyszerre futtatható ellenőrzések száma (böngészők összesen, minden munkafolyamatban)
+check_capacity = 1
+
+def create_browser_pool(share=1):
+    return BrowserPool(
+        int(os.getenv("BROWSER_POOL_SIZE", "1")),
+        standby=int(os.getenv("STANDBY_PAGES", "0")),
+        standby_factory=lambda browser: browser_pool.open_reader(
+            browser, SkypeReader, request_filter=create_request_filter()
+        ),
+        standby_max_age=float(os.getenv("STANDBY_MAX_AGE", "300")),
+        standby_retry=float(os.getenv("STANDBY_RETRY_SECONDS", "30")),
+        governor=create_resource_governor(share)
+    )
+
+def init_worker(index):
+    # Munkafolyamatban fut (WORKER_PROCESSES > 1): a folyamat saját böngészőkészlete
+    global browser_pool
+    ensure_browser_installed()
+    browser_pool = create_browser_pool(int(os.getenv("WORKER_PROCESSES", "1")))
+    browser_pool.start()
+    return browser_pool
+
+def worker_check(browser, payload):
+    # A folyamatok között csak egyszerű dict utazik
+    deadline = Deadline(payload.pop("deadline_at", None))
+    result = check_account(browser, SkypeCredentials(**payload), deadline)
+    return {**result.model_dump(), "conversations": result.conversations}
+
+def check_pool():
+    return worker_pool or browser_pool
+
+@app.on_event("startup")
+def start_browser_pool():
+    global browser_pool, worker_pool, scheduler, check_capacity, admission, history_store
+    # Előzetes ellenőrzés: a Chromium telepítése induláskor, nem az első kérésnél
+    ensure_browser_installed()
+    processes = int(os.getenv("WORKER_PROCESSES", "1"))
+    check_capacity = int(os.getenv("BROWSER_POOL_SIZE", "1")) * max(1, processes)
+    admission = create_admission_control(
+        check_capacity,
+        memory_check=lambda: bool(check_pool()) and check_pool().over_memory_cap()
+    )
+    history_store = create_history_store()
+    if processes > 1:
+        worker_pool = WorkerPool(
+            processes,
+            init_worker,
+            worker_check,
+            restart_backoff=float(os.getenv("WORKER_RESTART_BACKOFF", "5"))
+        )
+        worker_pool.start()
+    else:
+        browser_pool = create_browser_pool()
+        browser_pool.start()
+    scheduler = StatsScheduler(
+        scheduled_check,
+        interval=float(os.getenv("SCHEDULER_INTERVAL", "300")),
+        jitter=float(os.getenv("SCHEDULER_JITTER", "0.1")),
+        max_concurrent=int(os.getenv("SCHEDULER_MAX_CONCURRENT", "1")),
+        initial_spread=float(os.getenv("SCHEDULER_INITIAL_SPREAD", "30")),
+        on_result=scheduled_result
+    )
+    scheduler.start()
+
+@app.on_event("shutdown")
+def stop_browser_pool():
+    if scheduler:
+        scheduler.stop()
+    if check_pool():
+        check_pool().shutdown()
+    if history_store:
+        history_store.close()
+
+def failed_stats(cred, error):
+    return SkypeStats(
+        email=cred.email,
+        total_messages=0,
+        unread_messages=0,
+        error=error
+    )
+
+DEADLINE_ERROR = "A kérés határideje lejárt"
+
+def deadline_failure(cred):
+    return failed_stats(cred, DEADLINE_ERROR)
+
+def check_account(browser, cred, deadline=None):
+    # A sorban várakozás alatt lejárt kérésnél el sem indítjuk a böngészőt
+    if deadline and deadline.expired():
+        metrics.CHECKS.labels("expired").inc()
+        return deadline_failure(cred)
+    started = time.perf_counter()
+    result = run_account_check(browser, cred, deadline)
+    metrics.CHECK_SECONDS.observe(time.perf_counter() - started)
+    metrics.CHECKS.labels("failure" if result.error else "success").inc()
+    return result
+
+def run_account_check(browser, cred, deadline=None):
+    # A böngésző szálán fut: saját kontextus a fióknak, utána csak azt zárjuk be
+    reader = None
+    try:
+        print(f"Bejelentkezés a következő fiókkal: {cred.email}")
+        storage_state = session_store.load(cred.email, cred.password) if session_store else None
+        # Mentett munkamenet nélkül az előre betöltött bejelentkezési oldal is megfelel
+        if not storage_state:
+            reader = browser_pool.take_standby(browser)
+            if reader:
+                reader.deadline = deadline or Deadline()
+        if not reader:
+            reader = browser_pool.open_reader(
+                browser,
+                SkypeReader,
+                storage_state=storage_state,
+                request_filter=create_request_filter(),
+                deadline=deadline
+            )
+        
+        login_success = reader.login(cred.email, cred.password)
+        if session_store:
+            if login_success and not reader.session_restored:
+                session_store.save(cred.email, cred.password, reader.export_session())
+            elif not login_success and storage_state:
+                session_store.invalidate(cred.email)
+        if login_success:
+            stats = reader.get_message_stats()
+            if stats:
+                oldest_date = None
+                if stats['oldest_unread_date']:
+                    if isinstance(stats['oldest_unread_date'], dict):
+                        oldest_date = stats['oldest_unread_date']['text']
+                    else:
+                        oldest_date = stats['oldest_unread_date']
+                
+                return SkypeStats(
                     email=cred.email,
-                    total_messages=0,
-                    unread_messages=0,
-                    error="Sikertelen bejelentkezés"
-                ))
-            
+                    total_messages=stats['total_messages'],
+                    unread_messages=stats['unread_messages'],
+                    oldest_unread_date=oldest_date,
+                    conversations=stats.get('conversations')
+                )
+            return failed_stats(cred, "Nem sikerült lekérni a statisztikákat")
+        return failed_stats(cred, "Sikertelen bejelentkezés")
+        
+    except Exception as e:
+        print(f"Hiba történt: {str(e)}")
+        metrics.FAILURES.labels(metrics.failure_type(e)).inc()
+        return failed_stats(cred, str(e))
+    finally:
+        if reader:
+            try:
+                reader.close()
+            except Exception as e:
+                print(f"Hiba a böngésző bezárása során: {str(e)}")
+
+def account_key(cred):
+    # A jelszó is a kulcs része, hogy hibás jelszóval ne kapjon senki eredményt
+    return hashlib.sha256(f"{cred.email.strip().lower()}\0{cred.password}".encode('utf-8')).hexdigest()
+
+def start_check(cred, deadline=None):
+    if not worker_pool:
+        return browser_pool.submit(lambda browser: check_account(browser, cred, deadline))
+    # Fiók-affinitás: ugyanaz az email mindig ugyanahhoz a munkafolyamathoz kerül
+    future = Future()
+
+    def decode(source):
+        try:
+            future.set_result(SkypeStats(**source.result()))
         except Exception as e:
-            print(f"Hiba történt: {str(e)}")
-            results.append(SkypeStats(
-                email=cred.email,
-                total_messages=0,
-                unread_messages=0,
-                error=str(e)
-            ))
+            future.set_exception(e)
+
+    payload = {**cred.model_dump(), "deadline_at": deadline.expires_at if deadline else None}
+    worker_pool.submit(payload, cred.email.strip().lower()).add_done_callback(decode)
+    return future
+
+def shared_check(cred, deadline=None):
+    # (future, shared): ha a fiók ellenőrzése már fut, annak az eredményét kapjuk (a csatlakozók
+    # a saját határidejükig várnak rá). Ha a futó ellenőrzés határideje korábbi a miénknél, és
+    # emiatt bukik el, utána a mi határidőnkkel indul újra; párhuzamos második bejelentkezés nincs.
+    future, shared = in_flight.do(
+        account_key(cred),
+        lambda: start_check(cred, deadline),
+        deadline.expires_at if deadline else None,
+        lambda result: result.error != DEADLINE_ERROR
+    )
+    if shared:
+        print(f"Már futó ellenőrzéshez csatlakozás: {cred.email}")
+        metrics.CHECKS.labels("joined").inc()
+    return future, shared
+
+def cached_stats(cred):
+    # Gyorsítótárból kiszolgálható eredmény; elavult találatnál háttérfrissítést indít
+    cached = result_cache.get(account_key(cred)) if result_cache else None
+    if not cached:
+        return None
+    value, age, status = cached
+    metrics.CHECKS.labels(status).inc()
+    if status == "stale":
+        refresh_in_background(cred)
+    return value.model_copy(update={"cache_status": status, "age_seconds": round(age, 1)})
+
+def store_result(cred, result):
+    # Minden friss eredmény az előzményekbe is bekerül (háttérszálon, kötegelve)
+    if history_store:
+        history_store.record(cred.email, result)
+    if result_cache and not result.error:
+        result_cache.put(account_key(cred), result)
+
+def unread_snapshot(result):
+    # Az ETag és a long-poll alapja: csak az olvasatlan szám és a legrégebbi olvasatlan időpont
+    return {
+        "unread_messages": result.unread_messages if result else None,
+        "oldest_unread_date": result.oldest_unread_date if result else None
+    }
+
+def scheduled_result(cred, result):
+    store_result(cred, result)
+    changes.publish(cred.email.strip().lower(), unread_snapshot(result))
+
+def scheduled_check(cred):
+    # Memóriakorlát felett az ütemezett frissítés elmarad (az ütemező a következő körben próbálja)
+    if admission:
+        admission.check_memory()
+    return shared_check(cred)[0]
+
+def refresh_in_background(cred):
+    key = account_key(cred)
+    if admission and admission.memory_check and admission.memory_check():
+        # Memóriakorlát felett az elavult eredményt szolgáljuk ki, frissítés nélkül
+        return
+    if not result_cache.begin_refresh(key):
+        return
+    print(f"Elavult eredmény háttérfrissítése: {cred.email}")
+
+    def finish(source):
+        try:
+            store_result(cred, source.result())
+        except Exception as e:
+            print(f"Hiba a háttérfrissítés során: {str(e)}")
         finally:
-            if reader:
-                try:
-                    reader.close()
-                except Exception as e:
-                    print(f"Hiba a böngésző bezárása során: {str(e)}")
-    
+            result_cache.end_refresh(key)
+
+    shared_check(cred)[0].add_done_callback(finish)
+
+def submit_checks(credentials, concurrency=None, use_cache=True, deadline=None):
+    # Egy kérés fiókjai párhuzamosan futnak, legfeljebb `concurrency` egyszerre;
+    # a visszaadott future-ök sorrendje megegyezik a bemenetével. Ugyanaz a fiók
+    # egy kérésen belül egyszer fut, és a más kérésekben már futó ellenőrzéshez csatlakozik.
+    # Ha a munkasor tele van, Overloaded kivételt dob, mielőtt bármi elindulna.
+    limit = max(1, concurrency or int(os.getenv("CHECK_CONCURRENCY", str(check_capacity))))
+    slots = threading.Semaphore(limit)
+    futures = [Future() for _ in credentials]
+    pending = {}
+
+    for cred, target in zip(credentials, futures):
+        cached = cached_stats(cred) if use_cache else None
+        if cached:
+            target.set_result(cached)
+        else:
+            pending.setdefault(account_key(cred), []).append((cred, target))
+
+    if admission:
+        admission.admit(sum(len(waiters) for waiters in pending.values()))
+
+    def finish(waiters, results, seconds=None):
+        for cred, target in waiters:
+            target.set_result(results(cred))
+            if admission:
+                admission.release(seconds)
+                seconds = None
+
+    def forward(source, waiters, owner, started):
+        if owner:
+            slots.release()
+        try:
+            result = source.result()
+            if owner:
+                store_result(waiters[0][0], result)
+            update = {"cache_status": "fresh", "age_seconds": 0.0}
+            finish(
+                waiters,
+                lambda cred: result.model_copy(update={**update, "email": cred.email}),
+                time.monotonic() - started if owner else None
+            )
+        except Exception as e:
+            print(f"Hiba történt: {str(e)}")
+            finish(waiters, lambda cred: failed_stats(cred, str(e)))
+
+    def feed():
+        for waiters in pending.values():
+            # A lejárt kérés hátralévő fiókjai el sem indulnak
+            remaining = deadline.remaining() if deadline else None
+            if remaining is not None and (remaining <= 0 or not slots.acquire(timeout=remaining)):
+                finish(waiters, deadline_failure)
+                continue
+            if remaining is None:
+                slots.acquire()
+            started = time.monotonic()
+            source, shared = shared_check(waiters[0][0], deadline)
+            if shared:
+                slots.release()
+            source.add_done_callback(
+                lambda source, waiters=waiters, owner=not shared, started=started: forward(source, waiters, owner, started)
+            )
+
+    if pending:
+        threading.Thread(target=feed, name="check-feeder", daemon=True).start()
+    return futures
+
+def request_deadline(seconds=None, header=None):
+    # Másodpercben: ?deadline=N paraméter vagy X-Deadline fejléc; alapból CHECK_DEADLINE (0: nincs)
+    return Deadline.after(seconds or header or float(os.getenv("CHECK_DEADLINE", "0")))
+
+def admitted_checks(credentials, concurrency, use_cache, deadline):
+    # Túlterhelésnél 429 + Retry-After, a munkasornál nagyobb kérésnél 413
+    if admission and admission.max_pending and len(credentials) > admission.max_pending:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Egy kérésben legfeljebb {admission.max_pending} fiók küldhető"
+        )
+    try:
+        return submit_checks(credentials, concurrency, use_cache, deadline)
+    except Overloaded as e:
+        metrics.CHECKS.labels("rejected").inc(len(credentials))
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def wait_result(future, cred, deadline):
+    # A hívó legfeljebb a határidejéig vár; az ellenőrzés maga is eddig fut
+    try:
+        return future.result(timeout=deadline.remaining())
+    except TimeoutError:
+        return deadline_failure(cred)
+
+@app.post("/check-messages", response_model=List[SkypeStats])
+def check_messages(
+    credentials: List[SkypeCredentials],
+    concurrency: Optional[int] = None,
+    use_cache: bool = True,
+    deadline: Optional[float] = None,
+    x_deadline: Optional[float] = Header(None),
+    accept: Optional[str] = Header(None)
+):
+    budget = request_deadline(deadline, x_deadline)
+    futures = admitted_checks(credentials, concurrency, use_cache, budget)
+    results = [wait_result(future, cred, budget) for future, cred in zip(futures, credentials)]
+    # Tömör formátum (oszlopos JSON vagy MessagePack) beszélgetésenkénti részletekkel
+    media_type = compact_response.negotiate(accept)
+    if media_type:
+        return Response(compact_response.render(results, media_type), media_type=media_type)
     return results
 
+def stream_events(credentials, futures, deadline, sse):
+    # Minden fiók eredménye azonnal megy, amint elkészül; a végén összesítő esemény
+    started = time.monotonic()
+    indexes = {future: index for index, future in enumerate(futures)}
+    failed = 0
+
+    def encode(event, payload):
+        data = json.dumps(payload, ensure_ascii=False)
+        if sse:
+            return f"event: {event}\ndata: {data}\n\n"
+        return data + "\n"
+
+    done = set()
+    try:
+        for future in as_completed(futures, timeout=deadline.remaining()):
+            done.add(future)
+            result = future.result()
+            if result.error:
+                failed += 1
+            yield encode("result", {"type": "result", "index": indexes[future], **result.model_dump()})
+    except TimeoutError:
+        # Határidő: a még futó fiókok hibaként zárulnak
+        for future, index in indexes.items():
+            if future not in done:
+                failed += 1
+                yield encode("result", {"type": "result", "index": index, **deadline_failure(credentials[index]).model_dump()})
+
+    yield encode("summary", {
+        "type": "summary",
+        "total": len(futures),
+        "failed": failed,
+        "elapsed_seconds": round(time.monotonic() - started, 3)
+    })
+
+@app.post("/check-messages/stream")
+def check_messages_stream(
+    credentials: List[SkypeCredentials],
+    request: Request,
+    concurrency: Optional[int] = None,
+    use_cache: bool = True,
+    format: Optional[str] = None,
+    deadline: Optional[float] = None,
+    x_deadline: Optional[float] = Header(None)
+):
+    # NDJSON alapból; SSE a ?format=sse paraméterrel vagy 'Accept: text/event-stream' fejléccel
+    sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+    # A beengedés még a válasz megkezdése előtt dől el, hogy a 429 státuszkód kimehessen
+    budget = request_deadline(deadline, x_deadline)
+    futures = admitted_checks(credentials, concurrency, use_cache, budget)
+    return StreamingResponse(
+        stream_events(credentials, futures, budget, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+def submit_job(request: JobRequest):
+    # Azonnal visszaadja a feladat azonosítóját; az eredmények a háttérben gyűlnek
+    try:
+        job = job_store.create([cred.email for cred in request.accounts], request.callback_url)
+    except JobStoreFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    deadline = request_deadline(request.deadline)
+    try:
+        futures = admitted_checks(request.accounts, request.concurrency, True, deadline)
+    except HTTPException:
+        job_store.discard(job)
+        raise
+    # Egy határidő nélküli, már futó ellenőrzéshez csatlakozott fiók sem várhat tovább a határidőnél
+    if deadline.remaining() is not None:
+        job_store.expire_after(job, deadline.remaining(), lambda index: deadline_failure(request.accounts[index]))
+    for index, future in enumerate(futures):
+        future.add_done_callback(lambda future, index=index: job_store.set_result(job, index, future.result()))
+    return describe(job)
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def job_status(job_id: str):
+    job = job_store.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Nincs ilyen feladat, vagy már lejárt")
+    return describe(job)
+
+@app.post("/accounts", response_model=AccountStatus)
+def register_account(cred: SkypeCredentials):
+    # A fiók a háttérütemezőbe kerül, és rendszeresen frissül
+    return scheduler.register(cred)
+
+@app.get("/accounts", response_model=List[AccountStatus])
+def list_accounts():
+    return scheduler.statuses()
+
+@app.get("/accounts/{email}", response_model=AccountStatus)
+def account_status(email: str):
+    status = scheduler.status(email)
+    if not status:
+        raise HTTPException(status_code=404, detail="A fiók nincs regisztrálva")
+    return status
+
+@app.delete("/accounts/{email}")
+def unregister_account(email: str):
+    if not scheduler.unregister(email):
+        raise HTTPException(status_code=404, detail="A fiók nincs regisztrálva")
+    changes.forget(email.strip().lower())
+    return {"status": "ok"}
+
+def unread_state(email):
+    status = scheduler.status(email)
+    if not status:
+        raise HTTPException(status_code=404, detail=f"A fiók nincs regisztrálva: {email}")
+    return {"email": status["email"], **unread_snapshot(status["stats"])}
+
+def entity_tag(payload):
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+async def conditional_unread(emails, build, if_none_match, wait):
+    # If-None-Match egyezésnél 304; ?wait=N esetén legfeljebb N másodpercig (LONG_POLL_MAX)
+    # tartja a kérést, amíg valamelyik fiók olvasatlan száma vagy legrégebbi dátuma meg nem változik
+    subscription = changes.subscribe([email.strip().lower() for email in emails])
+    try:
+        payload = build()
+        etag = entity_tag(payload)
+        deadline = time.monotonic() + min(wait, LONG_POLL_MAX)
+        # Az ébresztés csak jelzés (pl. az indulás utáni első publish akkor is ébreszt, ha
+        # az érték nem változott); addig várunk, amíg az ETag tényleg más lesz, vagy lejár az idő
+        while wait and etag_matches(if_none_match, etag):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not await subscription.wait(remaining):
+                break
+            subscription.reset()
+            payload = build()
+            etag = entity_tag(payload)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(payload, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    finally:
+        changes.unsubscribe(subscription)
+
+@app.get("/accounts/{email}/unread")
+async def account_unread(email: str, wait: float = 0, if_none_match: Optional[str] = Header(None)):
+    # Az ütemező legutóbbi eredményéből; ETag-gel és opcionális long-poll-lal
+    return await conditional_unread([email], lambda: unread_state(email), if_none_match, wait)
+
+@app.get("/unread")
+async def accounts_unread(
+    email: List[str] = Query(...),
+    wait: float = 0,
+    if_none_match: Optional[str] = Header(None)
+):
+    # Több regisztrált fiók egyben: ?email=a@x&email=b@y
+    return await conditional_unread(
+        email,
+        lambda: {"accounts": [unread_state(address) for address in email]},
+        if_none_match,
+        wait
+    )
+
+@app.get("/history")
+def latest_history():
+    # Fiókonként a legutolsó mentett pillanatkép
+    if not history_store:
+        raise HTTPException(status_code=404, detail="Az előzmények mentése ki van kapcsolva")
+    return history_store.latest()
+
+@app.get("/history/{email}")
+def account_history(
+    email: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    bucket: Optional[float] = None,
+    max_points: int = 500
+):
+    # Időablakokra összesített idősor (Unix időbélyegek, másodpercben)
+    if not history_store:
+        raise HTTPException(status_code=404, detail="Az előzmények mentése ki van kapcsolva")
+    return history_store.history(email, since=since, until=until, max_points=max_points, bucket=bucket)
+
+@app.get("/history-stats")
+def history_stats():
+    return history_store.stats() if history_store else {"enabled": False}
+
+@app.get("/pool-stats")
+def pool_stats():
+    # Böngészőindítás vs. kontextus-létrehozás átlagos ideje
+    return check_pool().stats()
+
+@app.get("/request-filter-stats")
+def request_filter_stats():
+    # Kérésszűrő összesített megtakarítása az ellenőrzések során
+    return total_report()
+
+@app.get("/selector-stats")
+def selector_stats():
+    # Olvasatlan-jelző szelektorok találati statisztikája (ebben a folyamatban)
+    stats = get_selector_stats()
+    return stats.stats() if stats else {"enabled": False}
+
+@app.get("/admission-stats")
+def admission_stats():
+    return admission.stats() if admission else {}
+
+@app.get("/cache-stats")
+def cache_stats():
+    stats = result_cache.stats() if result_cache else {"enabled": False}
+    return {**stats, "in_flight": in_flight.stats(), "long_poll": changes.stats()}
+
+@app.get("/metrics")
+def prometheus_metrics():
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/health")
 def health_check():
-    return {"status": "ok"} 
\ No newline at end of file
+    # Élő, ha a folyamat válaszol; kész, ha a böngészők és a tartalék oldalak is elkészültek
+    return {"status": "ok", "live": True, "ready": bool(check_pool() and check_pool().ready())}
+
+@app.get("/health/ready")
+def readiness_check():
+    pool = check_pool()
+    if not pool or not pool.ready():
+        stats = pool.stats() if pool else {}
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "starting",
+                "standby_ready": stats.get("standby_ready", 0),
+                "standby_target": stats.get("standby_target", 0)
+            }
+        )
+    if pool.over_memory_cap():
+        # A terheléselosztó addig ne küldjön ide új kérést, amíg a böngészők memóriája a korlát felett van
+        return JSONResponse(status_code=503, content={"status": "memory_pressure"})
+    return {"status": "ready"} 
\ No newline at end of file
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SESSION_CACHE_ENABLED", "0")
+
+from playwright.sync_api import sync_playwright
+from skype_reader import launch_browser
+from api import SkypeReader
+from benchmarks.synthetic import chat_list_html
+import lean_scan
+from selector_stats import SelectorStats
+
+# A teljes (get_messages_js_code) és a takarékos (lean_scan) kiolvasás összehasonlítása
+# nagy szintetikus chat listán, valamint a teljes szkennelés az összes jelzővel és a
+# megfigyelt találatok alapján rendezett (adaptív) jelzősorrenddel. Futtatás a repó gyökeréből:
+#   python -m benchmarks.bench_extraction --sizes 100,1000,5000 --output extraction.json
+
+def measure(evaluate, rounds):
+    evaluate()  # bemelegítés
+    timings = []
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = evaluate()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "max_ms": round(max(timings), 2),
+        "payload_bytes": len(json.dumps(result, default=str)),
+        "total_chats": result["totalChats"],
+        "unread_count": result["unreadCount"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="100,1000,5000")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    reader = SkypeReader.__new__(SkypeReader)
+    full_js = reader.get_messages_js_code()
+    results = []
+
+    playwright = sync_playwright().start()
+    browser = launch_browser(playwright)
+    page = browser.new_page()
+    try:
+        for size in [int(size) for size in args.sizes.split(",")]:
+            page.set_content(chat_list_html(size))
+            all_selectors = {"selectors": SkypeReader.UNREAD_INDICATORS, "firstHit": False}
+            full = measure(lambda: page.evaluate(full_js, all_selectors), args.rounds)
+            lean = measure(
+                lambda: lean_scan.scan(page, SkypeReader.UNREAD_INDICATORS, SkypeReader.LENIENT_INDICATORS),
+                args.rounds
+            )
+            # Tanulás egy teljes szkennelésből, utána a halott jelzők nélküli sorrend mérése (SELECTOR_STATS_SKIP_DEAD=1)
+            stats = SelectorStats(
+                os.path.join(tempfile.mkdtemp(), "selector_stats.json"), dead_after=1, probe_every=args.rounds * 10, skip_dead=True
+            )
+            learned = page.evaluate(full_js, all_selectors)
+            stats.record(learned["selectorHits"])
+            selectors, _ = stats.plan(SkypeReader.UNREAD_INDICATORS)
+            adaptive = measure(lambda: page.evaluate(full_js, {"selectors": selectors, "firstHit": True}), args.rounds)
+            adaptive["selectors"] = selectors
+            results.append({"chats": size, "full": full, "lean": lean, "adaptive": adaptive})
+            print(
+                f"{size} chat: teljes {full['median_ms']} ms / {full['payload_bytes']} B, "
+                f"takarékos {lean['median_ms']} ms / {lean['payload_bytes']} B, "
+                f"adaptív ({len(selectors)}/{len(SkypeReader.UNREAD_INDICATORS)} jelző) {adaptive['median_ms']} ms"
+            )
+    finally:
+        browser.close()
+        playwright.stop()
+
+    report = {"benchmark": "extraction", "rounds": args.rounds, "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
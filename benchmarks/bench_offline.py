@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import time
+
+from benchmarks.mock_skype import MockSkypeServer
+
+# Végponttól végpontig mérés a valódi web.skype.com helyett helyi utánzaton:
+# SkypeReader.login, get_message_stats (kiolvasási módonként) és a /check-messages
+# végpont, 10 és 10 000 közötti chat számmal. Futtatás a repó gyökeréből:
+#   python -m benchmarks.bench_offline --sizes 10,100,1000,10000 --output offline.json
+
+def summarize(timings):
+    return {
+        "median_ms": round(statistics.median(timings), 1),
+        "min_ms": round(min(timings), 1),
+        "max_ms": round(max(timings), 1),
+        "rounds": len(timings)
+    }
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - started) * 1000, result
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,100,1000,10000")
+    parser.add_argument("--modes", default="full,lean,tracker,network")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--virtual", action="store_true", help="virtualizált chat lista (a harvest módhoz)")
+    parser.add_argument("--skip-endpoint", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    server = MockSkypeServer(virtual=args.virtual).start()
+    # A modulok importálás előtt olvassák a beállításokat
+    os.environ["SKYPE_URL"] = server.url
+    os.environ.setdefault("WAIT_LIST_QUIET_MS", "300")
+    os.environ.setdefault("SESSION_CACHE_ENABLED", "0")
+    os.environ.setdefault("RESULT_CACHE_TTL", "0")
+    modes = [mode for mode in args.modes.split(",") if mode]
+    if "network" in modes:
+        # A válaszfigyelőt a kontextus létrehozásakor kell felrakni, a mód utána mérésenként váltható
+        os.environ["EXTRACTION_MODE"] = "network"
+
+    from playwright.sync_api import sync_playwright
+    from skype_reader import launch_browser
+    import api
+
+    results = []
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    playwright = sync_playwright().start()
+    browser = launch_browser(playwright)
+    try:
+        for size in sizes:
+            server.chat_count = size
+            login_timings = []
+            stats_timings = {mode: [] for mode in modes}
+            for _ in range(args.rounds):
+                reader = api.SkypeReader(browser)
+                try:
+                    elapsed, success = timed(lambda: reader.login("bench@example.com", "jelszo"))
+                    if not success:
+                        raise RuntimeError("A bejelentkezés az utánzaton sikertelen")
+                    login_timings.append(elapsed)
+                    for mode in modes:
+                        reader.extraction_mode = mode
+                        elapsed, stats = timed(reader.get_message_stats)
+                        if not stats or stats["total_messages"] == 0:
+                            raise RuntimeError(f"Üres eredmény ({mode} mód, {size} chat)")
+                        stats_timings[mode].append(elapsed)
+                finally:
+                    reader.close()
+
+            results.append({"chats": size, "operation": "login", **summarize(login_timings)})
+            for mode in modes:
+                results.append({"chats": size, "operation": "get_message_stats", "mode": mode, **summarize(stats_timings[mode])})
+            print(f"{size} chat: bejelentkezés {summarize(login_timings)['median_ms']} ms, " + ", ".join(
+                f"{mode} {summarize(stats_timings[mode])['median_ms']} ms" for mode in modes
+            ))
+    finally:
+        browser.close()
+        playwright.stop()
+
+    if not args.skip_endpoint:
+        from fastapi.testclient import TestClient
+        with TestClient(api.app) as client:
+            for size in sizes:
+                server.chat_count = size
+                timings = []
+                for _ in range(args.rounds):
+                    elapsed, response = timed(lambda: client.post(
+                        "/check-messages?use_cache=false",
+                        json=[{"email": "bench@example.com", "password": "jelszo"}]
+                    ))
+                    if response.status_code != 200 or response.json()[0]["error"]:
+                        raise RuntimeError(f"Hibás válasz: {response.text}")
+                    timings.append(elapsed)
+                results.append({"chats": size, "operation": "check_messages_endpoint", **summarize(timings)})
+                print(f"{size} chat: /check-messages {summarize(timings)['median_ms']} ms")
+
+    server.stop()
+    report = {
+        "benchmark": "offline",
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "virtual": args.virtual,
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
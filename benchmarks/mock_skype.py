@@ -0,0 +1,139 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from benchmarks.synthetic import chat_list_html, chat_rows, conversations_payload, virtual_chat_list_html
+import json
+import threading
+
+# Helyi Skype utánzat: ugyanazokat a szelektorokat használja, mint a valódi
+# bejelentkezés (loginfmt, passwd, #idSIButton9, DontShowAgain), utána pedig
+# beállítható méretű chat listát ad. Bejelentkezés után süti jelzi a munkamenetet,
+# így a mentett munkamenet visszaállítása is mérhető. A chat oldal a valódi klienshez
+# hasonlóan lapozva letölti a beszélgetés-listát is (a 'network' kiolvasási módhoz).
+LOGIN_PAGE = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>Bejelentkezés</title></head>
+<body>
+<div id="step"></div>
+<script>
+const step = document.getElementById('step');
+const showEmail = () => {
+    step.innerHTML = '<input name="loginfmt" type="email"><button id="idSIButton9">Tovább</button>';
+    document.getElementById('idSIButton9').onclick = () => setTimeout(showPassword, 50);
+};
+const showPassword = () => {
+    step.innerHTML = '<input name="passwd" type="password"><button id="idSIButton9">Bejelentkezés</button>';
+    document.getElementById('idSIButton9').onclick = () => setTimeout(() => { location.href = '/kmsi'; }, 50);
+};
+showEmail();
+</script>
+</body></html>"""
+
+KMSI_PAGE = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>Bejelentkezve marad?</title></head>
+<body>
+<form id="kmsi" action="/chats" method="get">
+  <input type="checkbox" name="DontShowAgain">
+  <button id="idSIButton9" type="submit">Igen</button>
+</form>
+<script>
+document.addEventListener('keydown', (event) => {
+    if (event.key === 'Enter') {
+        document.cookie = 'mock_session=1; path=/';
+        document.getElementById('kmsi').submit();
+    }
+});
+</script>
+</body></html>"""
+
+CONVERSATIONS_SCRIPT = """<script>
+(async () => {
+    let url = '/v1/users/ME/conversations?page=0&pageSize=100';
+    while (url) {
+        const data = await (await fetch(url)).json();
+        url = data._metadata.backwardLink;
+    }
+})();
+</script>"""
+
+class MockSkypeServer:
+    def __init__(self, chat_count=100, virtual=False, unread_ratio=0.1, host="127.0.0.1", port=0):
+        self.chat_count = chat_count
+        self.virtual = virtual
+        self.unread_ratio = unread_ratio
+        self.page_cache = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlparse(self.path).path
+                logged_in = "mock_session=1" in self.headers.get("Cookie", "")
+                if path == "/":
+                    if logged_in:
+                        self.redirect("/chats")
+                    else:
+                        self.send_html(LOGIN_PAGE)
+                elif path == "/kmsi":
+                    self.send_html(KMSI_PAGE)
+                elif path == "/chats":
+                    self.send_html(server.chat_page())
+                elif path == "/v1/users/ME/conversations":
+                    query = parse_qs(urlparse(self.path).query)
+                    self.send_json(server.conversations(
+                        int(query.get("page", ["0"])[0]),
+                        int(query.get("pageSize", ["100"])[0])
+                    ))
+                else:
+                    self.send_error(404)
+
+            def redirect(self, location):
+                self.send_response(302)
+                self.send_header("Location", location)
+                self.end_headers()
+
+            def send_html(self, html, content_type="text/html; charset=utf-8"):
+                body = html.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_json(self, payload):
+                self.send_html(json.dumps(payload, ensure_ascii=False), "application/json")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def chat_page(self):
+        key = (self.chat_count, self.virtual, self.unread_ratio)
+        if key not in self.page_cache:
+            render = virtual_chat_list_html if self.virtual else chat_list_html
+            self.page_cache[key] = render(self.chat_count, self.unread_ratio).replace("</body>", CONVERSATIONS_SCRIPT + "</body>")
+        return self.page_cache[key]
+
+    def conversations(self, page, page_size):
+        return conversations_payload(chat_rows(self.chat_count, self.unread_ratio), page, page_size)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="mock-skype", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+if __name__ == "__main__":
+    import os
+    server = MockSkypeServer(
+        chat_count=int(os.getenv("MOCK_CHAT_COUNT", "100")),
+        virtual=os.getenv("MOCK_VIRTUAL", "0") == "1",
+        port=int(os.getenv("MOCK_PORT", "8765"))
+    )
+    print(f"Skype utánzat: {server.url}")
+    server.httpd.serve_forever()
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+import json
+import random
+
+# Szintetikus Skype chat lista a mérésekhez: a valódi oldal szerkezetét követi
+# (div[role="list"] > div[role="listitem"], aria-label dátummal, olvasatlan jelzővel)
+BADGE_CLASS = "css-1dbjc4n r-1awozwy r-1mlx99i r-1867qdf r-1yadl64 r-1777fci r-285fr0 r-s1qlax"
+DAY_LABELS = ["ma", "tegnap", "tegnapelőtt"]
+ROW_HEIGHT = 72
+
+def chat_rows(count, unread_ratio=0.1, seed=42):
+    rng = random.Random(seed)
+    rows = []
+    for index in range(count):
+        if index % 3 == 0:
+            date = f"2024.{rng.randint(1, 12):02d}.{rng.randint(1, 28):02d}. {rng.randint(0, 23)}:{rng.randint(0, 59):02d}"
+        else:
+            date = f"{rng.choice(DAY_LABELS)} {rng.randint(0, 23)}:{rng.randint(0, 59):02d}"
+        unread = rng.randint(1, 20) if rng.random() < unread_ratio else 0
+        rows.append({"id": f"chat-{index}", "label": f"Partner {index}, {date}", "unread": unread})
+    return rows
+
+def chat_item_html(index, row):
+    badge = ""
+    if row["unread"]:
+        badge = f'<div class="{BADGE_CLASS}"><div role="status">{row["unread"]}</div></div>'
+    return (
+        f'<div role="listitem" data-id="{row["id"]}" aria-label="{row["label"]}" style="height: {ROW_HEIGHT}px;">'
+        f'<div class="avatar"></div>'
+        f'<div class="body"><span class="name">Partner {index}</span>'
+        f'<span class="preview">Utolsó üzenet szövege {index}</span></div>'
+        f'{badge}</div>'
+    )
+
+def chat_list_html(count, unread_ratio=0.1, seed=42):
+    rows = chat_rows(count, unread_ratio, seed)
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Skype</title></head>'
+        '<body><div role="list" style="height: 900px; overflow-y: auto;">'
+        + "".join(chat_item_html(index, row) for index, row in enumerate(rows)) +
+        '</div></body></html>'
+    )
+
+def virtual_chat_list_html(count, unread_ratio=0.1, seed=42, overscan=5):
+    # Virtualizált lista: egyszerre csak a látható sorok (és néhány tartalék) vannak a DOM-ban
+    rows = chat_rows(count, unread_ratio, seed)
+    return """<!DOCTYPE html><html><head><meta charset="utf-8"><title>Skype</title></head>
+<body>
+<div id="scroller" style="height: 900px; overflow-y: auto;">
+  <div role="list" id="list" style="position: relative; height: %(total)dpx;"></div>
+</div>
+<script>
+const rows = %(rows)s;
+const rowHeight = %(row_height)d;
+const overscan = %(overscan)d;
+const badgeClass = %(badge_class)s;
+const scroller = document.getElementById('scroller');
+const list = document.getElementById('list');
+const render = () => {
+    const first = Math.max(0, Math.floor(scroller.scrollTop / rowHeight) - overscan);
+    const last = Math.min(rows.length, Math.ceil((scroller.scrollTop + scroller.clientHeight) / rowHeight) + overscan);
+    const html = [];
+    for (let i = first; i < last; i++) {
+        const row = rows[i];
+        const badge = row.unread ? `<div class="${badgeClass}"><div role="status">${row.unread}</div></div>` : '';
+        html.push(`<div role="listitem" data-id="${row.id}" aria-label="${row.label}" ` +
+                  `style="position: absolute; top: ${i * rowHeight}px; height: ${rowHeight}px; width: 100%%;">` +
+                  `<span class="name">Partner ${i}</span>${badge}</div>`);
+    }
+    list.innerHTML = html.join('');
+};
+scroller.addEventListener('scroll', () => requestAnimationFrame(render));
+render();
+</script>
+</body></html>""" % {
+        "total": count * ROW_HEIGHT,
+        "rows": json.dumps(rows, ensure_ascii=False),
+        "row_height": ROW_HEIGHT,
+        "overscan": overscan,
+        "badge_class": json.dumps(BADGE_CLASS)
+    }
+
+def conversations_payload(rows, page=0, page_size=100):
+    # A webes kliens beszélgetés-lista válaszának (/v1/users/ME/conversations) utánzata;
+    # az olvasatlanságot az olvasási határ (consumptionhorizon) jelzi, mint a valódi válaszban
+    base = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+    start = page * page_size
+    conversations = []
+    for index, row in enumerate(rows[start:start + page_size], start):
+        sent = base - timedelta(minutes=7 * index)
+        message_id = int(sent.timestamp() * 1000)
+        horizon = message_id - 1 if row["unread"] else message_id
+        conversations.append({
+            "id": f"8:{row['id']}",
+            "lastMessage": {
+                "id": str(message_id),
+                "composetime": sent.isoformat().replace("+00:00", "Z"),
+                "content": f"Utolsó üzenet szövege {index}"
+            },
+            "properties": {"consumptionhorizon": f"{horizon};{horizon};{horizon}"}
+        })
+    more = start + page_size < len(rows)
+    return {
+        "conversations": conversations,
+        "_metadata": {
+            "totalCount": len(conversations),
+            "backwardLink": f"/v1/users/ME/conversations?page={page + 1}&pageSize={page_size}" if more else None
+        }
+    }
@@ -0,0 +1,299 @@
+from playwright.sync_api import sync_playwright
+from concurrent.futures import Future
+from skype_reader import SkypeReader, launch_browser
+import os
+import queue
+import threading
+import time
+
+IDLE_CHECK_SECONDS = float(os.getenv("BROWSER_IDLE_CHECK_SECONDS", "5"))
+
+class BrowserPool:
+    # Hosszú életű Chromium példányok; minden böngészőt a saját szála kezel,
+    # mert a szinkron Playwright objektumok szálhoz kötöttek.
+    def __init__(self, size=1, standby=0, standby_factory=None, standby_max_age=300, standby_retry=30, governor=None):
+        self.size = max(1, size)
+        # Opcionális erőforrás-felügyelő: memória, kor és használat szerinti újraindítás
+        self.governor = governor
+        self.tasks = queue.Queue()
+        self.workers = []
+        self.lock = threading.Lock()
+        self.launch_count = 0
+        self.launch_seconds = 0.0
+        self.context_count = 0
+        self.context_seconds = 0.0
+        # Tartalék oldalak: a bejelentkezési űrlapig előre betöltött readerek,
+        # böngészőnként a saját szálán tartva és üresjáratban újratöltve
+        self.standby = max(0, standby) if standby_factory else 0
+        self.standby_factory = standby_factory
+        self.standby_max_age = standby_max_age
+        self.standby_retry = standby_retry
+        self.standby_pages = {}
+        self.standby_hits = 0
+        self.standby_misses = 0
+        self.standby_expired = 0
+        self.standby_errors = 0
+        self.local = threading.local()
+        self.started = False
+        self.stopping = False
+        self.warmed = threading.Event()
+        if not self.standby:
+            self.warmed.set()
+
+    def start(self):
+        ready_events = []
+        errors = []
+        for index in range(self.size):
+            ready = threading.Event()
+            worker = threading.Thread(
+                target=self._worker,
+                args=(index, ready, errors),
+                name=f"browser-{index}",
+                daemon=True
+            )
+            worker.start()
+            self.workers.append(worker)
+            ready_events.append(ready)
+
+        for ready in ready_events:
+            ready.wait()
+        if errors:
+            self.shutdown()
+            raise errors[0]
+        self.started = True
+        print(f"Böngészőkészlet elindítva ({self.size} böngésző, {self.standby} tartalék oldal)")
+
+    def _launch(self, playwright):
+        started = time.perf_counter()
+        if self.governor:
+            browser = self.governor.launch(lambda: launch_browser(playwright))
+        else:
+            browser = launch_browser(playwright)
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.launch_count += 1
+            self.launch_seconds += elapsed
+        print(f"Böngésző elindítva {elapsed:.2f} mp alatt")
+        return browser
+
+    def _worker(self, index, ready, errors):
+        try:
+            if self.governor:
+                playwright = self.governor.start_driver(lambda: sync_playwright().start())
+            else:
+                playwright = sync_playwright().start()
+            browser = self._launch(playwright)
+        except Exception as e:
+            print(f"Hiba a(z) {index}. böngésző indítása során: {str(e)}")
+            errors.append(e)
+            ready.set()
+            return
+        standby = self.standby_pages.setdefault(index, [])
+        self.local.standby = standby
+        target = self.standby // self.size + (1 if index < self.standby % self.size else 0)
+        next_refill = 0.0
+        ready.set()
+
+        while True:
+            self._expire_standby(standby)
+            # Üresjáratban töltjük fel a tartalékot, a beérkező feladat mindig elsőbbséget kap
+            if len(standby) < target:
+                timeout = max(0.0, next_refill - time.monotonic())
+            elif standby:
+                timeout = max(0.0, min(created for _, created in standby) + self.standby_max_age - time.monotonic())
+            else:
+                timeout = None
+            if self.governor and self.governor.memory_cap:
+                # Memóriakorlátnál üresjáratban is ellenőrzünk: korlát felett nem jön új
+                # feladat, így a legnagyobb böngészőt feladat nélkül kell újraindítani
+                timeout = min(timeout, IDLE_CHECK_SECONDS) if timeout is not None else IDLE_CHECK_SECONDS
+            try:
+                task = self.tasks.get(timeout=timeout)
+            except queue.Empty:
+                if self.governor and self.governor.memory_cap:
+                    try:
+                        browser = self._maybe_recycle(index, playwright, browser, standby)
+                    except Exception as e:
+                        print(f"Hiba a(z) {index}. böngésző újraindítása során: {str(e)}")
+                if len(standby) < target and self.governor and self.governor.over_cap():
+                    # Memóriakorlát felett nem töltünk újabb tartalék oldalt
+                    next_refill = time.monotonic() + self.standby_retry
+                elif len(standby) < target:
+                    try:
+                        if not browser.is_connected():
+                            browser = self._launch(playwright)
+                        self._refill_standby(browser, standby)
+                        next_refill = 0.0
+                    except Exception as e:
+                        print(f"Hiba a tartalék oldal betöltése során: {str(e)}")
+                        with self.lock:
+                            self.standby_errors += 1
+                        next_refill = time.monotonic() + self.standby_retry
+                    if len(self.standby_pages) == self.size and self.standby_count() >= self.standby:
+                        self.warmed.set()
+                continue
+            if task is None:
+                break
+            func, future = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                # Összeomlott böngésző helyett újat indítunk
+                if not browser.is_connected():
+                    print(f"A(z) {index}. böngésző kapcsolata megszakadt, újraindítás...")
+                    standby.clear()
+                    if self.governor:
+                        self.governor.forget(browser)
+                    browser = self._launch(playwright)
+                browser = self._maybe_recycle(index, playwright, browser, standby)
+                future.set_result(func(browser))
+            except Exception as e:
+                future.set_exception(e)
+            if self.governor:
+                self.governor.record_check(browser)
+                try:
+                    browser = self._maybe_recycle(index, playwright, browser, standby)
+                except Exception as e:
+                    print(f"Hiba a(z) {index}. böngésző újraindítása során: {str(e)}")
+
+        for reader, _ in standby:
+            self._close_reader(reader)
+        standby.clear()
+        try:
+            browser.close()
+        except Exception as e:
+            print(f"Hiba a böngésző bezárása során: {str(e)}")
+        playwright.stop()
+
+    def _maybe_recycle(self, index, playwright, browser, standby):
+        # Feladatok között hívjuk, így a böngészőn nincs folyamatban lévő ellenőrzés;
+        # a tartalék oldalakat bezárjuk, a böngészőt újat indítva cseréljük
+        reason = self.governor.recycle_reason(browser) if self.governor else None
+        if not reason:
+            return browser
+        print(f"A(z) {index}. böngésző újraindítása (ok: {reason})...")
+        for reader, _ in standby:
+            self._close_reader(reader)
+        standby.clear()
+        self.governor.forget(browser)
+        self.governor.record_recycle(reason)
+        try:
+            browser.close()
+        except Exception as e:
+            print(f"Hiba a böngésző bezárása során: {str(e)}")
+        return self._launch(playwright)
+
+    def _refill_standby(self, browser, standby):
+        reader = self.standby_factory(browser)
+        try:
+            reader.preload_login()
+        except Exception:
+            self._close_reader(reader)
+            raise
+        standby.append((reader, time.monotonic()))
+        print(f"Tartalék oldal kész ({self.standby_count()}/{self.standby})")
+
+    def _expire_standby(self, standby):
+        # A bejelentkezési űrlap egy idő után lejár, ezért a régi tartalékot eldobjuk
+        now = time.monotonic()
+        for item in [item for item in standby if now - item[1] >= self.standby_max_age]:
+            standby.remove(item)
+            self._close_reader(item[0])
+            with self.lock:
+                self.standby_expired += 1
+
+    def _close_reader(self, reader):
+        try:
+            reader.close()
+        except Exception as e:
+            print(f"Hiba a tartalék oldal bezárása során: {str(e)}")
+
+    def take_standby(self, browser):
+        # A böngésző szálán hívandó: előre betöltött reader, vagy None, ha nincs kész tartalék
+        standby = getattr(self.local, "standby", None)
+        if not self.standby or standby is None:
+            return None
+        self._expire_standby(standby)
+        while standby:
+            reader, _ = standby.pop()
+            if reader.browser is browser and not reader.page.is_closed():
+                with self.lock:
+                    self.standby_hits += 1
+                return reader
+            self._close_reader(reader)
+        with self.lock:
+            self.standby_misses += 1
+        return None
+
+    def standby_count(self):
+        return sum(len(standby) for standby in list(self.standby_pages.values()))
+
+    def over_memory_cap(self):
+        return bool(self.governor) and self.governor.over_cap()
+
+    def ready(self):
+        # Forgalmat csak akkor kapjunk, ha a böngészők futnak és a tartalék először feltöltődött
+        return self.started and not self.stopping and self.warmed.is_set() and all(
+            worker.is_alive() for worker in self.workers
+        )
+
+    def submit(self, func):
+        # A func a böngészőt kapja paraméterként, és a böngésző szálán fut
+        future = Future()
+        self.tasks.put((func, future))
+        return future
+
+    def open_reader(self, browser, reader_class=SkypeReader, **kwargs):
+        reader = reader_class(browser, **kwargs)
+        with self.lock:
+            self.context_count += 1
+            self.context_seconds += reader.context_setup_seconds
+        return reader
+
+    def stats(self):
+        with self.lock:
+            return {
+                "browsers": self.size,
+                "launches": self.launch_count,
+                "avg_launch_seconds": self.launch_seconds / self.launch_count if self.launch_count else None,
+                "contexts": self.context_count,
+                "avg_context_seconds": self.context_seconds / self.context_count if self.context_count else None,
+                "queued_tasks": self.tasks.qsize(),
+                "standby_target": self.standby,
+                "standby_ready": self.standby_count(),
+                "standby_hits": self.standby_hits,
+                "standby_misses": self.standby_misses,
+                "standby_expired": self.standby_expired,
+                "standby_errors": self.standby_errors,
+                "resources": self.governor.stats() if self.governor else None
+            }
+
+    def shutdown(self):
+        self.stopping = True
+        for _ in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout=30)
+        self.workers = []
+        print("Böngészőkészlet leállítva")
+
+def measure(contexts=5):
+    # Böngészőindítás és kontextus-létrehozás idejének összehasonlítása
+    pool = BrowserPool(1)
+    pool.start()
+
+    def open_and_close(browser):
+        reader = pool.open_reader(browser)
+        reader.close()
+
+    for _ in range(contexts):
+        pool.submit(open_and_close).result()
+    stats = pool.stats()
+    pool.shutdown()
+
+    print(f"Átlagos böngészőindítás: {stats['avg_launch_seconds']:.3f} mp")
+    print(f"Átlagos kontextus-létrehozás: {stats['avg_context_seconds']:.3f} mp ({stats['contexts']} minta)")
+    return stats
+
+if __name__ == "__main__":
+    measure(int(os.getenv("MEASURE_CONTEXTS", "5")))
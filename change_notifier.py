@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+class Subscription:
+    def __init__(self, keys, loop):
+        self.keys = keys
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def wake(self):
+        # Csak az eseményhurok szálán hívható
+        if not self.future.done():
+            self.future.set_result(True)
+
+    def reset(self):
+        # Ébredés után újra várakoztatható; csak az eseményhurok szálán hívható
+        if self.future.done():
+            self.future = self.loop.create_future()
+
+    async def wait(self, timeout):
+        # True, ha valamelyik kulcs megváltozott, False időtúllépésnél
+        try:
+            # shield: időtúllépéskor a future ne törlődjön, a feliratkozás újra várható legyen
+            await asyncio.wait_for(asyncio.shield(self.future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+class ChangeNotifier:
+    # Hosszú lekérdezések (long-poll) ébresztése: a háttérszálak (ütemező) publish()-sal
+    # jelzik egy fiók új állapotát, és ha az eltér az előzőtől, a rá váró kérések
+    # asyncio future-jei az eseményhurok szálán (call_soon_threadsafe) teljesülnek.
+    def __init__(self):
+        self.fingerprints = {}
+        self.subscriptions = {}
+        self.notified = 0
+        self.lock = threading.Lock()
+
+    def subscribe(self, keys):
+        # Az állapot kiolvasása előtt kell feliratkozni, hogy a közben jött változás se vesszen el
+        subscription = Subscription(keys, asyncio.get_running_loop())
+        with self.lock:
+            for key in keys:
+                self.subscriptions.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for key in subscription.keys:
+                waiting = self.subscriptions.get(key)
+                if waiting:
+                    waiting.discard(subscription)
+                    if not waiting:
+                        del self.subscriptions[key]
+
+    def publish(self, key, fingerprint):
+        with self.lock:
+            if key in self.fingerprints and self.fingerprints[key] == fingerprint:
+                return False
+            self.fingerprints[key] = fingerprint
+            waiting = list(self.subscriptions.get(key, ()))
+            self.notified += len(waiting)
+        for subscription in waiting:
+            subscription.loop.call_soon_threadsafe(subscription.wake)
+        return True
+
+    def forget(self, key):
+        # Kiregisztrált fióknál a várakozók azonnal választ kapnak
+        with self.lock:
+            self.fingerprints.pop(key, None)
+            waiting = list(self.subscriptions.get(key, ()))
+        for subscription in waiting:
+            subscription.loop.call_soon_threadsafe(subscription.wake)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "waiting": len({subscription for waiting in self.subscriptions.values() for subscription in waiting}),
+                "notified": self.notified
+            }
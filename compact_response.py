@@ -0,0 +1,53 @@
+import json
+import msgpack
+from conversation_details import iso_from_text
+
+# Tömör tömeges válasz a /check-messages végponthoz, az Accept fejléc alapján.
+# Mezőnkénti oszlopok (a kulcsok egyszer szerepelnek), a beszélgetések egy közös
+# táblában, a fiókra az 'accounts' oszlopok indexével hivatkozva.
+COLUMNAR = "application/vnd.skype-stats.columnar+json"
+MSGPACK = "application/msgpack"
+MEDIA_TYPES = {
+    COLUMNAR: COLUMNAR,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK
+}
+
+def negotiate(accept):
+    # A legnagyobb súlyú támogatott tömör formátum, vagy None (hagyományos JSON)
+    best, best_q = None, 0.0
+    for part in (accept or "").split(","):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media_type.lower() in MEDIA_TYPES and q > best_q:
+            best, best_q = MEDIA_TYPES[media_type.lower()], q
+    return best
+
+def columnar(results):
+    # results: SkypeStats lista; a beszélgetések a (nem szerializált) 'conversations' mezőből
+    accounts = {}
+    conversations = {"account": [], "id": [], "unread": [], "last_message": []}
+    for index, result in enumerate(results):
+        fields = result.model_dump()
+        fields["oldest_unread_at"] = iso_from_text(fields.get("oldest_unread_date"))
+        for field, value in fields.items():
+            accounts.setdefault(field, []).append(value)
+        for conversation_id, unread, last_message in result.conversations or []:
+            conversations["account"].append(index)
+            conversations["id"].append(conversation_id)
+            conversations["unread"].append(unread)
+            conversations["last_message"].append(last_message)
+    return {"accounts": accounts, "conversations": conversations}
+
+def render(results, media_type):
+    data = columnar(results)
+    if media_type == MSGPACK:
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
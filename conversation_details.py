@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+import re
+
+# Beszélgetésenkénti részletek egységes alakban: (azonosító, olvasatlan, utolsó üzenet ISO időbélyege).
+# A böngészőben futó szkennelés a relatív napokat már abszolút dátummá (vagy ms időbélyeggé)
+# alakítja; itt ezekből lesz egyszer ISO időpont. A parse_date a nyers magyar formákat is érti
+# ("ÉÉÉÉ.HH.NN. ÓÓ:PP", "ma/tegnap/tegnapelőtt ÓÓ:PP", vagy csak "ÓÓ:PP" a mai napra).
+FULL_DATE = re.compile(r"(\d{4})\.(\d{1,2})\.(\d{1,2})\.")
+TIME = re.compile(r"(\d{1,2}):(\d{2})")
+# A hosszabb alak előbb, hogy a 'tegnapelőtt' ne 'tegnap'-ként illeszkedjen
+RELATIVE_DAY = re.compile(r"\b(tegnapelőtt|tegnap|ma)\b", re.IGNORECASE)
+DAY_OFFSETS = {"ma": 0, "tegnap": 1, "tegnapelőtt": 2}
+
+def parse_date(text, now=None):
+    # Helyi idő szerinti, időzónát is tartalmazó datetime, vagy None
+    if not text:
+        return None
+    now = now or datetime.now()
+    time_match = TIME.search(text)
+    hours, minutes = (int(time_match[1]), int(time_match[2])) if time_match else (0, 0)
+    try:
+        full_date = FULL_DATE.search(text)
+        if full_date:
+            parsed = datetime(int(full_date[1]), int(full_date[2]), int(full_date[3]), hours, minutes)
+        elif time_match:
+            day = RELATIVE_DAY.search(text)
+            offset = DAY_OFFSETS[day[1].lower()] if day else 0
+            parsed = (now - timedelta(days=offset)).replace(hour=hours, minute=minutes, second=0, microsecond=0)
+        else:
+            return None
+    except ValueError:
+        return None
+    return parsed.astimezone()
+
+def iso_from_ms(ts):
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts / 1000, tz=timezone.utc).astimezone().isoformat()
+
+def iso_from_text(text, now=None):
+    parsed = parse_date(text, now)
+    return parsed.isoformat() if parsed else None
+
+def conversation_rows(info):
+    # A kiolvasási módok eredményéből: a tömör módok (lean, harvest, tracker, network)
+    # [azonosító, olvasatlan, ms] elemeket adnak, a teljes szkennelés 'details' listát
+    # szöveges dátummal. None, ha a mód nem ad beszélgetésenkénti adatot.
+    if not info:
+        return None
+    if info.get("items") is not None:
+        return [(str(item[0]), item[1], iso_from_ms(item[2])) for item in info["items"]]
+    if info.get("details") is not None:
+        now = datetime.now()
+        return [
+            (str(detail.get("id") or detail.get("index")), detail.get("unreadCount") or 0, iso_from_text(detail.get("date"), now))
+            for detail in info["details"]
+        ]
+    return None
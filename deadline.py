@@ -0,0 +1,35 @@
+import time
+
+class DeadlineExceeded(Exception):
+    pass
+
+class Deadline:
+    # Egy kérés teljes időkerete (falióra szerinti lejárat, így munkafolyamatok között
+    # is átadható); minden várakozás, újrapróbálkozás és időtúllépés ebből gazdálkodik
+    def __init__(self, expires_at=None):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds):
+        return cls(time.time() + seconds if seconds else None)
+
+    def remaining(self):
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.time())
+
+    def expired(self):
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def cap(self, seconds):
+        # A megadott korlát, de legfeljebb a hátralévő idő; lejárt határidőnél kivétel,
+        # mert a Playwright a 0 időkorlátot végtelennek veszi
+        remaining = self.remaining()
+        if remaining is None:
+            return seconds
+        if remaining <= 0:
+            raise DeadlineExceeded("A kérés határideje lejárt")
+        return min(seconds, remaining)
+
+    def cap_ms(self, seconds):
+        return self.cap(seconds) * 1000
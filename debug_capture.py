@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+
+# Módok: 'off' (alapértelmezett), 'failure' (csak sikertelen kiolvasásnál),
+# 'sample' (a futások egy mintájánál), 'always' (minden próbálkozásnál)
+MODES = ("off", "failure", "sample", "always")
+
+class DebugRun:
+    def __init__(self, capture, account, sampled):
+        self.capture = capture
+        self.sampled = sampled
+        self.prefix = "_".join([
+            hashlib.sha256(account.strip().lower().encode('utf-8')).hexdigest()[:12],
+            time.strftime("%Y%m%d-%H%M%S"),
+            uuid.uuid4().hex[:6]
+        ])
+
+    def wants(self, success):
+        if self.capture.mode == "always":
+            return True
+        if self.capture.mode == "sample":
+            return self.sampled
+        return not success
+
+    def save(self, attempt, html_content, debug_info):
+        # A page.content() a hívó szálán fut, a tömörítés és írás már a háttérszálon
+        self.capture.enqueue(f"{self.prefix}_{attempt}_page.html.gz", html_content)
+        self.capture.enqueue(f"{self.prefix}_{attempt}_info.json.gz", json.dumps(debug_info, default=str, ensure_ascii=False))
+
+class DebugCapture:
+    # Debug fájlok aszinkron, tömörített mentése egy méretkorlátos gyűrűpufferbe
+    def __init__(self, mode="off", sample_rate=0.1, directory="debug", max_bytes=50 * 1024 * 1024, queue_size=32):
+        if mode not in MODES:
+            raise ValueError(f"Ismeretlen debug mód: {mode}")
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.writer = None
+        if self.mode != "off":
+            os.makedirs(self.directory, exist_ok=True)
+            self.writer = threading.Thread(target=self._write_loop, name="debug-capture", daemon=True)
+            self.writer.start()
+
+    def start_run(self, account):
+        if self.mode == "off":
+            return None
+        return DebugRun(self, account or "ismeretlen", random.random() < self.sample_rate)
+
+    def enqueue(self, name, content):
+        # Ha a háttérszál lemaradt, inkább eldobjuk, mint hogy a kérést lassítsuk
+        try:
+            self.queue.put_nowait((name, content))
+        except queue.Full:
+            self.dropped += 1
+            print(f"Debug mentés eldobva (sor tele): {name}")
+
+    def _write_loop(self):
+        while True:
+            name, content = self.queue.get()
+            try:
+                path = os.path.join(self.directory, name)
+                with gzip.open(path, 'wt', encoding='utf-8') as f:
+                    f.write(content)
+                print(f"Debug fájl elmentve: {path}")
+                self._trim()
+            except Exception as e:
+                print(f"Hiba a debug fájl mentése során: {str(e)}")
+
+    def _trim(self):
+        # A legrégebbi fájlok törlése, amíg a könyvtár a méretkorlát fölött van
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+shared_capture = None
+shared_lock = threading.Lock()
+
+def get_debug_capture():
+    # Folyamatonként egy közös példány; kikapcsolt módban None
+    global shared_capture
+    with shared_lock:
+        if shared_capture is None:
+            shared_capture = DebugCapture(
+                mode=os.getenv("DEBUG_CAPTURE_MODE", "off"),
+                sample_rate=float(os.getenv("DEBUG_CAPTURE_SAMPLE_RATE", "0.1")),
+                directory=os.getenv("DEBUG_CAPTURE_DIR", "debug"),
+                max_bytes=int(os.getenv("DEBUG_CAPTURE_MAX_BYTES", str(50 * 1024 * 1024)))
+            )
+        return shared_capture if shared_capture.mode != "off" else None
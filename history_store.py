@@ -0,0 +1,271 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    account TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    total_messages INTEGER NOT NULL,
+    unread_messages INTEGER NOT NULL,
+    oldest_unread_date TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS snapshots_account_time ON snapshots (account, taken_at);
+CREATE INDEX IF NOT EXISTS snapshots_time ON snapshots (taken_at);
+CREATE TABLE IF NOT EXISTS latest (
+    account TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    total_messages INTEGER NOT NULL,
+    unread_messages INTEGER NOT NULL,
+    oldest_unread_date TEXT,
+    error TEXT
+);
+"""
+
+# Időablakonkénti összesítés; a pont értékei az ablak utolsó pillanatképéből,
+# mellette az ablak maximuma, átlaga és mintaszáma. Mindkét lépés az (account, taken_at) indexet használja.
+HISTORY_QUERY = """
+WITH buckets AS (
+    SELECT CAST(taken_at / :bucket AS INTEGER) AS slot, MAX(taken_at) AS last_at,
+           MAX(unread_messages) AS max_unread, AVG(unread_messages) AS avg_unread, COUNT(*) AS samples
+    FROM snapshots
+    WHERE account = :account AND taken_at >= :since AND taken_at < :until AND error IS NULL
+    GROUP BY slot
+)
+SELECT buckets.last_at, snapshots.unread_messages, snapshots.total_messages, snapshots.oldest_unread_date,
+       buckets.max_unread, buckets.avg_unread, buckets.samples
+FROM buckets
+JOIN snapshots ON snapshots.account = :account AND snapshots.taken_at = buckets.last_at AND snapshots.error IS NULL
+ORDER BY buckets.slot
+"""
+
+# Tömörítés: a compact_after-nél régebbi soroknál fiókonként és időablakonként csak az utolsó marad
+COMPACT_QUERY = """
+DELETE FROM snapshots
+WHERE taken_at < :cutoff AND rowid NOT IN (
+    SELECT MAX(rowid) FROM snapshots
+    WHERE taken_at < :cutoff
+    GROUP BY account, error IS NULL, CAST(taken_at / :bucket AS INTEGER)
+)
+"""
+
+class HistoryStore:
+    # Az ellenőrzések eredményeinek idősora helyi SQLite adatbázisban (WAL mód).
+    # Az írás egy háttérszálon, kötegelve történik, így a kérések nem várnak a lemezre;
+    # az olvasók szálanként saját kapcsolatot használnak, amit a WAL az írással párhuzamosan enged.
+    def __init__(self, path, retention=30 * 86400, compact_after=86400, compact_bucket=3600,
+                 batch_size=200, flush_interval=1.0, max_queue=10000, maintenance_interval=3600):
+        self.path = path
+        self.retention = retention
+        self.compact_after = compact_after
+        self.compact_bucket = compact_bucket
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.maintenance_interval = maintenance_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.local = threading.local()
+        self.written = 0
+        self.dropped = 0
+        self.compacted = 0
+        self.expired = 0
+        self.maintained_at = None
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        # Az auto_vacuum csak üres adatbázison állítható be, utána a tömörítés visszaadja a helyet
+        connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        connection.close()
+        self.thread = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self.thread.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _reader(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = self._connect()
+        return connection
+
+    def record(self, email, stats):
+        # Nem blokkol: ha a sor betelt, a pillanatkép elvész (a 'dropped' számláló mutatja)
+        row = (
+            email.strip().lower(),
+            email,
+            time.time(),
+            stats.total_messages,
+            stats.unread_messages,
+            stats.oldest_unread_date,
+            stats.error
+        )
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def _write_loop(self):
+        connection = self._connect()
+        next_maintenance = time.monotonic()
+        try:
+            while not (self.stopping.is_set() and self.queue.empty()):
+                batch = self._next_batch()
+                if batch:
+                    self._write(connection, batch)
+                if time.monotonic() >= next_maintenance:
+                    self._maintain(connection)
+                    next_maintenance = time.monotonic() + self.maintenance_interval
+        finally:
+            connection.close()
+
+    def _next_batch(self):
+        # Az első sorra legfeljebb flush_interval-ig vár, utána amennyi összegyűlt (batch_size-ig)
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, connection, batch):
+        try:
+            connection.execute("BEGIN")
+            connection.executemany(
+                "INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                [(account, taken_at, total, unread, oldest, error) for account, _, taken_at, total, unread, oldest, error in batch]
+            )
+            connection.executemany(
+                """INSERT INTO latest VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(account) DO UPDATE SET
+                       email = excluded.email, taken_at = excluded.taken_at,
+                       total_messages = excluded.total_messages, unread_messages = excluded.unread_messages,
+                       oldest_unread_date = excluded.oldest_unread_date, error = excluded.error
+                   WHERE excluded.taken_at >= latest.taken_at""",
+                batch
+            )
+            connection.execute("COMMIT")
+            with self.lock:
+                self.written += len(batch)
+        except Exception as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            print(f"Hiba az előzmények mentése során: {str(e)}")
+
+    def _maintain(self, connection):
+        # Megőrzési idő, tömörítés, majd a felszabadult lapok és a WAL fájl visszaadása
+        try:
+            now = time.time()
+            expired = connection.execute("DELETE FROM snapshots WHERE taken_at < ?", (now - self.retention,)).rowcount
+            connection.execute("DELETE FROM latest WHERE taken_at < ?", (now - self.retention,))
+            compacted = connection.execute(
+                COMPACT_QUERY, {"cutoff": now - self.compact_after, "bucket": self.compact_bucket}
+            ).rowcount
+            # A pragma lapokat lépésenként szabadít fel, ezért végig kell olvasni
+            connection.execute("PRAGMA incremental_vacuum").fetchall()
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            with self.lock:
+                self.expired += expired
+                self.compacted += compacted
+                self.maintained_at = now
+            if expired or compacted:
+                print(f"Előzmények karbantartása: {expired} lejárt, {compacted} tömörített sor törölve")
+        except Exception as e:
+            print(f"Hiba az előzmények karbantartása során: {str(e)}")
+
+    def history(self, email, since=None, until=None, max_points=500, bucket=None):
+        # Időablakokra összesített idősor; az ablak mérete alapból úgy, hogy legfeljebb max_points pont legyen
+        until = until or time.time()
+        since = since if since is not None else until - 7 * 86400
+        bucket = bucket or max(60, (until - since) / max(1, max_points))
+        rows = self._reader().execute(HISTORY_QUERY, {
+            "account": email.strip().lower(),
+            "since": since,
+            "until": until,
+            "bucket": bucket
+        }).fetchall()
+        return {
+            "email": email,
+            "since": since,
+            "until": until,
+            "bucket_seconds": bucket,
+            "points": [
+                {
+                    "taken_at": taken_at,
+                    "unread_messages": unread,
+                    "total_messages": total,
+                    "oldest_unread_date": oldest,
+                    "max_unread_messages": max_unread,
+                    "avg_unread_messages": round(avg_unread, 2),
+                    "samples": samples
+                }
+                for taken_at, unread, total, oldest, max_unread, avg_unread, samples in rows
+            ]
+        }
+
+    def latest(self):
+        rows = self._reader().execute(
+            "SELECT email, taken_at, total_messages, unread_messages, oldest_unread_date, error FROM latest ORDER BY account"
+        ).fetchall()
+        return [
+            {
+                "email": email,
+                "taken_at": taken_at,
+                "total_messages": total,
+                "unread_messages": unread,
+                "oldest_unread_date": oldest,
+                "error": error
+            }
+            for email, taken_at, total, unread, oldest, error in rows
+        ]
+
+    def stats(self):
+        try:
+            size = sum(
+                os.path.getsize(self.path + suffix)
+                for suffix in ("", "-wal") if os.path.exists(self.path + suffix)
+            )
+        except OSError:
+            size = None
+        with self.lock:
+            return {
+                "path": self.path,
+                "size_bytes": size,
+                "queued": self.queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "expired": self.expired,
+                "compacted": self.compacted,
+                "maintained_at": self.maintained_at
+            }
+
+    def close(self):
+        # A sorban maradt pillanatképek még kiíródnak
+        self.stopping.set()
+        self.thread.join(timeout=10)
+
+def create_history_store():
+    if os.getenv("HISTORY_ENABLED", "1") != "1":
+        return None
+    return HistoryStore(
+        os.getenv("HISTORY_DB_PATH", ".history/history.db"),
+        retention=float(os.getenv("HISTORY_RETENTION", str(30 * 86400))),
+        compact_after=float(os.getenv("HISTORY_COMPACT_AFTER", "86400")),
+        compact_bucket=float(os.getenv("HISTORY_COMPACT_BUCKET", "3600")),
+        batch_size=int(os.getenv("HISTORY_BATCH_SIZE", "200")),
+        flush_interval=float(os.getenv("HISTORY_FLUSH_INTERVAL", "1"))
+    )
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+import requests
+import threading
+import time
+import uuid
+
+class JobStoreFull(Exception):
+    pass
+
+class Job:
+    def __init__(self, emails, callback_url=None):
+        self.id = uuid.uuid4().hex
+        self.emails = emails
+        self.results = [None] * len(emails)
+        self.completed = 0
+        self.callback_url = callback_url
+        self.callback_status = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.timer = None
+
+    @property
+    def status(self):
+        return "done" if self.finished_at else "running"
+
+class JobStore:
+    # Memóriában tartott, korlátos méretű feladattár; a befejezett feladatok
+    # ttl másodperc után törlődnek.
+    def __init__(self, max_jobs=1000, ttl=3600):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _evict(self):
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job.finished_at and now - job.finished_at > self.ttl:
+                del self.jobs[job_id]
+        # Ha még mindig tele van, a legrégebben befejezett feladatok mennek
+        finished = [job for job in self.jobs.values() if job.finished_at]
+        finished.sort(key=lambda job: job.finished_at)
+        while len(self.jobs) >= self.max_jobs and finished:
+            del self.jobs[finished.pop(0).id]
+
+    def create(self, emails, callback_url=None):
+        with self.lock:
+            self._evict()
+            if len(self.jobs) >= self.max_jobs:
+                raise JobStoreFull("Túl sok futó feladat")
+            job = Job(emails, callback_url)
+            if not emails:
+                # Nincs mire várni: rögtön kész, így a lejárat is törli
+                job.finished_at = job.created_at
+            self.jobs[job.id] = job
+            return job
+
+    def discard(self, job):
+        with self.lock:
+            self.jobs.pop(job.id, None)
+
+    def get(self, job_id):
+        with self.lock:
+            self._evict()
+            return self.jobs.get(job_id)
+
+    def set_result(self, job, index, result):
+        # Fiókonként az első eredmény számít (a határidő után érkező már nem)
+        with self.lock:
+            if job.results[index] is not None:
+                return
+            job.results[index] = result
+            job.completed += 1
+            done = job.completed == len(job.results)
+            if done:
+                job.finished_at = time.time()
+        if done and job.timer:
+            job.timer.cancel()
+        if done and job.callback_url:
+            threading.Thread(target=self._send_callback, args=(job,), name=f"job-callback-{job.id}", daemon=True).start()
+
+    def expire_after(self, job, seconds, failure):
+        # A határidőig el nem készült fiókok a failure(index) eredménnyel zárulnak
+        def expire():
+            for index in range(len(job.results)):
+                self.set_result(job, index, failure(index))
+
+        with self.lock:
+            if job.finished_at:
+                return
+            job.timer = threading.Timer(seconds, expire)
+            job.timer.daemon = True
+        job.timer.start()
+
+    def _send_callback(self, job):
+        try:
+            response = requests.post(job.callback_url, json=describe(job), timeout=10)
+            job.callback_status = str(response.status_code)
+        except Exception as e:
+            print(f"Hiba a visszahívás küldése során ({job.id}): {str(e)}")
+            job.callback_status = "error"
+
+def describe(job):
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total": len(job.results),
+        "completed": job.completed,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+        "callback_status": job.callback_status,
+        "emails": job.emails,
+        # Még futó fióknál None
+        "results": [result.model_dump() if result is not None else None for result in job.results]
+    }
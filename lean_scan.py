@@ -0,0 +1,79 @@
+from unread_tracker import ANALYSE_ITEM_JS
+
+# Takarékos kiolvasás: a jelzőket egyetlen összevont szelektorral keresi,
+# a láthatóságot egy menetben olvassa (nincs írás közben, így egy layout elég),
+# nem naplóz, és csak tömör mezőket ad vissza: [azonosító, olvasatlan, időbélyeg].
+LEAN_SCAN_JS = """
+(config) => {
+    """ + ANALYSE_ITEM_JS + """
+    const items = document.querySelectorAll('div[role="listitem"]');
+    const combined = config.selectors.join(',');
+
+    // 1. Jelölt jelzők összegyűjtése (csak DOM lekérdezés, stílus olvasás nélkül)
+    const owners = [];
+    const candidates = [];
+    items.forEach((item, index) => {
+        for (const indicator of item.querySelectorAll(combined)) {
+            owners.push(index);
+            candidates.push(indicator);
+        }
+    });
+
+    // 2. Láthatóság egy menetben
+    const isVisible = (el) => {
+        if (el.checkVisibility) {
+            return el.checkVisibility({ checkOpacity: true, checkVisibilityCSS: true });
+        }
+        const style = window.getComputedStyle(el);
+        return style.display !== 'none' && style.visibility !== 'hidden' &&
+               style.opacity !== '0' && el.offsetParent !== null;
+    };
+    const counts = new Array(items.length).fill(0);
+    const infos = new Array(items.length);
+    candidates.forEach((indicator, i) => {
+        if (!isVisible(indicator)) return;
+        const text = indicator.textContent.trim();
+        const count = config.lenient || /^\\d+$/.test(text) ? parseInt(text) : NaN;
+        if (!isNaN(count) && count > 0) {
+            counts[owners[i]] = count;
+        } else if (config.lenient && text &&
+                   (text.toLowerCase().includes('olvasatlan') || text.toLowerCase().includes('unread'))) {
+            counts[owners[i]] = Math.max(counts[owners[i]], 1);
+        } else {
+            return;
+        }
+        // Az összevont szelektorból minden illeszkedő szelektor találatnak számít
+        const info = infos[owners[i]] || (infos[owners[i]] = { hits: [] });
+        for (const selector of config.selectors) {
+            if (indicator.matches(selector) && !info.hits.includes(selector)) info.hits.push(selector);
+        }
+    });
+
+    // 3. Tömör eredmény
+    let unreadCount = 0;
+    let oldest = null;
+    const compact = new Array(items.length);
+    items.forEach((item, index) => {
+        const date = parseItemDate(item.getAttribute('aria-label'));
+        const id = item.getAttribute('data-id') || item.id || String(index);
+        compact[index] = [id, counts[index], date ? date.ts : null];
+        if (counts[index] > 0) {
+            unreadCount = Math.max(unreadCount, counts[index]);
+            if (date && (!oldest || date.ts < oldest.ts)) oldest = date;
+        }
+    });
+
+    return {
+        totalChats: items.length,
+        unreadCount,
+        oldestUnreadDate: oldest ? { text: oldest.text } : null,
+        items: compact,
+        selectorHits: countHits(infos.filter(Boolean))
+    };
+}
+"""
+
+def scan(page, selectors, lenient=False):
+    # Az összevont szelektor miatt itt nincs korai kilépés; a sorrend csak a találat
+    # hozzárendelését és a halott szelektorok kihagyását befolyásolja
+    return page.evaluate(LEAN_SCAN_JS, {"selectors": selectors, "lenient": lenient})
@@ -0,0 +1,163 @@
+from unread_tracker import ANALYSE_ITEM_JS
+import os
+
+# Felső korlát egy görgetés utáni újrarajzolásra várásnál (nem fix várakozás:
+# az első DOM változásnál továbblép)
+SETTLE_MS = int(os.getenv("HARVEST_SETTLE_MS", "1500"))
+MAX_SCROLLS = int(os.getenv("HARVEST_MAX_SCROLLS", "5000"))
+MAX_IDLE_ROUNDS = int(os.getenv("HARVEST_MAX_IDLE_ROUNDS", "3"))
+# A határidőből ennyit meghagy a lista visszagörgetésére és az eredmény visszaküldésére
+DEADLINE_MARGIN_MS = int(os.getenv("HARVEST_DEADLINE_MARGIN_MS", "500"))
+
+# A virtualizált chat listát végiggörgeti, és a beszélgetéseket stabil kulcs
+# alapján gyűjti; elemenként csak [kulcs, olvasatlan, időbélyeg] marad meg.
+HARVEST_JS = """
+async (config) => {
+    """ + ANALYSE_ITEM_JS + """
+    const ITEM_SELECTOR = 'div[role="listitem"]';
+    const list = document.querySelector('div[role="list"]');
+    if (!list) {
+        return { totalChats: 0, unreadCount: 0, oldestUnreadDate: null, items: [], scrolls: 0 };
+    }
+
+    // A görgethető szülő megkeresése (maga a lista, vagy valamelyik őse)
+    let scroller = list;
+    while (scroller && scroller !== document.body) {
+        const overflow = window.getComputedStyle(scroller).overflowY;
+        if ((overflow === 'auto' || overflow === 'scroll') && scroller.scrollHeight > scroller.clientHeight) break;
+        scroller = scroller.parentElement;
+    }
+    if (!scroller || scroller === document.body) scroller = document.scrollingElement;
+
+    // Csak stabil azonosító lehet kulcs: az aria-label (előnézet, jelvény) görgetés közben
+    // változik, a görgetési pozíció pedig ugyanazt a sort többször számolná
+    const keyOf = (item) => item.getAttribute('data-id') || item.id || null;
+    const seen = new Map();
+    const oldestText = new Map();
+    const hitOf = new Map();
+    // Azonosító nélküli sorok: nem számolhatók pontosan, csak az olvasatlan maximumba
+    // és a legrégebbi időpontba számítanak, az eredmény pedig nem pontos (exact: false)
+    let unkeyedRows = 0;
+    let unkeyedUnread = 0;
+    let unkeyedOldest = null;
+
+    const harvest = () => {
+        let added = 0;
+        list.querySelectorAll(ITEM_SELECTOR).forEach((item) => {
+            const key = keyOf(item);
+            const info = analyseItem(item, config);
+            if (key === null) {
+                unkeyedRows++;
+                if (info.unreadCount > 0) {
+                    unkeyedUnread = Math.max(unkeyedUnread, info.unreadCount);
+                    if (info.date && (!unkeyedOldest || info.date.ts < unkeyedOldest.ts)) unkeyedOldest = info.date;
+                }
+                return;
+            }
+            if (!seen.has(key)) added++;
+            seen.set(key, [key, info.unreadCount, info.date ? info.date.ts : null]);
+            hitOf.set(key, info);
+            if (info.unreadCount > 0 && info.date) {
+                oldestText.set(key, info.date.text);
+            } else {
+                oldestText.delete(key);
+            }
+        });
+        return added;
+    };
+
+    // Az első DOM változásig (vagy legfeljebb settleMs-ig) vár, utána egy képkockát
+    const waitForChange = (timeout) => new Promise((resolve) => {
+        let done = false;
+        const finish = () => {
+            if (done) return;
+            done = true;
+            observer.disconnect();
+            clearTimeout(timer);
+            requestAnimationFrame(() => resolve());
+        };
+        const observer = new MutationObserver(finish);
+        observer.observe(list, { childList: true, subtree: true });
+        const timer = setTimeout(finish, timeout);
+    });
+    const nextFrame = () => new Promise((resolve) => requestAnimationFrame(() => resolve()));
+    // A kérés határideje (budgetMs, null: nincs); lejártakor az addig gyűjtöttel tér vissza
+    const stopAt = config.budgetMs === null ? Infinity : performance.now() + config.budgetMs;
+    const settleTimeout = () => Math.max(0, Math.min(config.settleMs, stopAt - performance.now()));
+
+    const startTop = scroller.scrollTop;
+    scroller.scrollTop = 0;
+    await nextFrame();
+
+    let scrolls = 0;
+    let idleRounds = 0;
+    let truncated = false;
+    while (scrolls < config.maxScrolls) {
+        if (performance.now() >= stopAt) {
+            truncated = true;
+            break;
+        }
+        const added = harvest();
+        const atEnd = scroller.scrollTop + scroller.clientHeight >= scroller.scrollHeight - 2;
+        if (atEnd) {
+            // A lista végén a lusta betöltés még hozhat új elemeket
+            await waitForChange(settleTimeout());
+            if (harvest() === 0) break;
+            continue;
+        }
+
+        scroller.scrollTop += Math.max(1, Math.floor(scroller.clientHeight * 0.9));
+        scrolls++;
+
+        // Ha a következő képernyőnyi elem már a DOM-ban van, nem kell újrarajzolásra várni
+        const items = list.querySelectorAll(ITEM_SELECTOR);
+        const last = items[items.length - 1];
+        const viewportBottom = scroller === document.scrollingElement
+            ? window.innerHeight
+            : scroller.getBoundingClientRect().bottom;
+        if (last && last.getBoundingClientRect().bottom > viewportBottom) {
+            await nextFrame();
+        } else {
+            await waitForChange(settleTimeout());
+        }
+
+        // Ha több görgetés óta nem jött új beszélgetés, a lista elakadt vagy véget ért
+        idleRounds = added === 0 ? idleRounds + 1 : 0;
+        if (idleRounds >= config.maxIdleRounds) break;
+    }
+
+    scroller.scrollTop = startTop;
+
+    let unreadCount = unkeyedUnread;
+    let oldest = unkeyedOldest;
+    const items = Array.from(seen.values());
+    for (const [key, count, ts] of items) {
+        if (count <= 0) continue;
+        unreadCount = Math.max(unreadCount, count);
+        if (ts !== null && (!oldest || ts < oldest.ts)) oldest = { text: oldestText.get(key), ts };
+    }
+    return {
+        totalChats: seen.size,
+        unreadCount,
+        oldestUnreadDate: oldest ? { text: oldest.text } : null,
+        items,
+        scrolls,
+        truncated,
+        exact: unkeyedRows === 0,
+        selectorHits: countHits(hitOf.values())
+    };
+}
+"""
+
+def harvest(page, selectors, lenient=False, settle_ms=SETTLE_MS, max_scrolls=MAX_SCROLLS, first_hit=False, remaining=None):
+    # remaining: a határidőből hátralévő másodpercek (None: nincs határidő)
+    budget_ms = None if remaining is None else max(0, remaining * 1000 - DEADLINE_MARGIN_MS)
+    return page.evaluate(HARVEST_JS, {
+        "selectors": selectors,
+        "lenient": lenient,
+        "firstHit": first_hit,
+        "settleMs": settle_ms,
+        "maxScrolls": max_scrolls,
+        "maxIdleRounds": MAX_IDLE_ROUNDS,
+        "budgetMs": budget_ms
+    })
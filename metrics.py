@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+import os
+import time
+
+# Több munkafolyamatnál (WORKER_PROCESSES > 1) a PROMETHEUS_MULTIPROC_DIR könyvtáron
+# keresztül gyűjtjük össze a folyamatok metrikáit; a könyvtárnak induláskor üresnek kell lennie
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+# A SkypeReader fázisai: launch, setup, navigation, credentials, list_wait,
+# stats_wait, extraction, close
+PHASE_SECONDS = Histogram(
+    "skype_reader_phase_seconds",
+    "Egy SkypeReader fázis időtartama másodpercben",
+    ["phase"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+)
+CHECK_SECONDS = Histogram(
+    "skype_check_seconds",
+    "Egy fiók teljes ellenőrzésének időtartama másodpercben",
+    buckets=(1, 2, 5, 10, 20, 30, 60, 120, 180, 300, 600)
+)
+CHECKS = Counter("skype_checks_total", "Fiók ellenőrzések eredmény szerint", ["result"])
+RETRIES = Counter("skype_reader_retries_total", "Újrapróbálkozások fázis szerint", ["phase"])
+FAILURES = Counter("skype_reader_failures_total", "Hibák típus szerint", ["type"])
+ACTIVE_BROWSERS = Gauge("skype_active_browsers", "Futó Chromium példányok száma", multiprocess_mode="livesum")
+BROWSER_MEMORY = Gauge("skype_browser_memory_bytes", "A böngészők összesített memóriahasználata (RSS)", multiprocess_mode="livesum")
+BROWSER_RECYCLES = Counter("skype_browser_recycles_total", "Böngésző újraindítások ok szerint", ["reason"])
+ACTIVE_CONTEXTS = Gauge("skype_active_contexts", "Nyitott böngésző-kontextusok száma", multiprocess_mode="livesum")
+
+@contextmanager
+def phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_SECONDS.labels(name).observe(time.perf_counter() - started)
+
+def failure_type(error):
+    # Playwright időtúllépés külön típus, a többi a kivétel osztályneve szerint
+    name = type(error).__name__
+    return "timeout" if "Timeout" in name else name
+
+def render():
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
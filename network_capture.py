@@ -0,0 +1,198 @@
+from datetime import datetime
+import json
+import os
+import re
+import sys
+import threading
+import time
+import readiness
+
+# A webes kliens a beszélgetéslistát XHR/fetch kérésekkel tölti le
+# (/v1/users/ME/conversations, lapozva); ezekből a válaszokból számolunk,
+# így nem kell megvárni a lista kirajzolását, és a virtualizált lista
+# által soha meg nem jelenített beszélgetések is látszanak.
+CONVERSATION_URL = re.compile(os.getenv("NETWORK_CONVERSATION_PATTERN", r"/v1/users/ME/conversations(\?|$)"))
+# Ennyi ideig nem érkezhet új beszélgetés-válasz, hogy a listát teljesnek tekintsük
+QUIET_MS = int(os.getenv("NETWORK_QUIET_MS", "1000"))
+
+def parse_time(value):
+    # ISO időbélyeg (pl. 2024-02-24T10:30:00.123Z) -> epoch ezredmásodperc
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+    except (TypeError, ValueError):
+        return None
+
+def format_time(ts):
+    # Ugyanaz a formátum, mint a DOM alapú kiolvasásé: "ÉÉÉÉ.HH.NN. ÓÓ:PP" helyi idő szerint
+    return datetime.fromtimestamp(ts / 1000).strftime("%Y.%m.%d. %H:%M")
+
+def unread_count(conversation):
+    # Kifejezett számláló, ha a válasz tartalmazza; különben az olvasási határ
+    # (consumptionhorizon: "utolsó olvasott üzenet;időbélyeg;...") és az utolsó üzenet összevetése
+    properties = conversation.get("properties") or {}
+    for source, key in ((conversation, "unreadCount"), (properties, "unreadcount"), (properties, "unreadCount")):
+        if source.get(key) is not None:
+            try:
+                return max(0, int(source[key]))
+            except (TypeError, ValueError):
+                pass
+    last_message = conversation.get("lastMessage") or {}
+    horizon = properties.get("consumptionhorizon")
+    if not last_message.get("id") or not horizon:
+        return 0
+    try:
+        return 1 if int(last_message["id"]) > int(horizon.split(";")[0]) else 0
+    except (TypeError, ValueError):
+        return 0
+
+def parse_conversations(payload):
+    # Beszélgetés-válasz -> [(azonosító, olvasatlan, utolsó üzenet ideje ms)]
+    rows = []
+    for conversation in (payload or {}).get("conversations") or []:
+        if not conversation.get("id"):
+            continue
+        last_message = conversation.get("lastMessage") or {}
+        ts = parse_time(last_message.get("composetime") or last_message.get("originalarrivaltime"))
+        rows.append((conversation["id"], unread_count(conversation), ts))
+    return rows
+
+def redact(payload):
+    # Felvételhez csak a számoláshoz szükséges mezők maradnak (üzenetszöveg nélkül)
+    conversations = []
+    for conversation in (payload or {}).get("conversations") or []:
+        last_message = conversation.get("lastMessage") or {}
+        properties = conversation.get("properties") or {}
+        conversations.append({
+            "id": conversation.get("id"),
+            "unreadCount": conversation.get("unreadCount"),
+            "lastMessage": {key: last_message.get(key) for key in ("id", "composetime", "originalarrivaltime")},
+            "properties": {key: properties.get(key) for key in ("consumptionhorizon", "unreadcount", "unreadCount") if key in properties}
+        })
+    return {"conversations": conversations, "_metadata": (payload or {}).get("_metadata") or {}}
+
+class ConversationCollector:
+    def __init__(self, record_dir=None):
+        self.conversations = {}
+        self.responses = 0
+        self.updated_at = None
+        self.record_dir = record_dir
+        self.lock = threading.Lock()
+
+    def attach(self, page):
+        page.on("response", self.on_response)
+        return self
+
+    def on_response(self, response):
+        if not CONVERSATION_URL.search(response.url) or response.status != 200:
+            return
+        try:
+            payload = response.json()
+        except Exception as e:
+            print(f"Nem értelmezhető beszélgetés-válasz: {str(e)}")
+            return
+        self.add(payload)
+        if self.record_dir:
+            self.record(payload)
+
+    def add(self, payload):
+        rows = parse_conversations(payload)
+        with self.lock:
+            # Növekményes frissítés: a későbbi válasz felülírja ugyanannak a beszélgetésnek az adatait
+            for conversation_id, count, ts in rows:
+                self.conversations[conversation_id] = (count, ts)
+            self.responses += 1
+            self.updated_at = time.monotonic()
+
+    def record(self, payload):
+        try:
+            os.makedirs(self.record_dir, exist_ok=True)
+            path = os.path.join(self.record_dir, f"conversations_{int(time.time() * 1000)}_{self.responses}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(redact(payload), f, ensure_ascii=False)
+        except Exception as e:
+            print(f"Hiba a beszélgetés-válasz mentése során: {str(e)}")
+
+    def wait(self, page, timeout=readiness.LIST_TIMEOUT, quiet_ms=QUIET_MS):
+        # Akkor kész, ha jött már válasz, és quiet_ms ideig nem jött újabb; a
+        # page.wait_for_timeout közben a Playwright feldolgozza a beérkező eseményeket
+        started = time.perf_counter()
+        while time.perf_counter() - started < timeout:
+            with self.lock:
+                updated_at = self.updated_at
+            if updated_at and (time.monotonic() - updated_at) * 1000 >= quiet_ms:
+                readiness.report("beszélgetés-válaszok", started, True)
+                return True
+            page.wait_for_timeout(readiness.POLL_INTERVAL_MS)
+        readiness.report("beszélgetés-válaszok", started, False)
+        return False
+
+    def wait_for_response(self, page, timeout=readiness.LIST_TIMEOUT, selector=None):
+        # Bejelentkezés utáni készenlét hálózati módban: az első beszélgetés-válasz megérkezése
+        # ("response"), a megadott elem megjelenése ("selector", pl. a bejelentkezési űrlap),
+        # vagy None időtúllépésnél; a lista kirajzolására nem vár
+        started = time.perf_counter()
+        while time.perf_counter() - started < timeout:
+            with self.lock:
+                responses = self.responses
+            if responses:
+                readiness.report("első beszélgetés-válasz", started, True)
+                return "response"
+            if selector and page.query_selector(selector):
+                readiness.report("első beszélgetés-válasz", started, True)
+                return "selector"
+            page.wait_for_timeout(readiness.POLL_INTERVAL_MS)
+        readiness.report("első beszélgetés-válasz", started, False)
+        return None
+
+    def stats(self):
+        # A többi kiolvasási móddal egyező alak; None, ha még nem jött válasz
+        with self.lock:
+            if not self.responses:
+                return None
+            items = [[conversation_id, count, ts] for conversation_id, (count, ts) in self.conversations.items()]
+        unread = [item for item in items if item[1] > 0]
+        dated = [item[2] for item in unread if item[2] is not None]
+        return {
+            "totalChats": len(items),
+            "unreadCount": max((item[1] for item in unread), default=0),
+            "oldestUnreadDate": {"text": format_time(min(dated))} if dated else None,
+            "items": items,
+            "responses": self.responses
+        }
+
+def replay(target, files):
+    # Felvett válaszok visszajátszása (page vagy context): a beszélgetés-kérések
+    # sorban ezeket kapják, a lista végén az utolsót
+    payloads = []
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            payloads.append(f.read())
+    served = [0]
+
+    def fulfil(route):
+        body = payloads[min(served[0], len(payloads) - 1)]
+        served[0] += 1
+        route.fulfill(status=200, content_type="application/json", body=body)
+
+    target.route(CONVERSATION_URL, fulfil)
+
+def attach(page):
+    # NETWORK_RECORD_DIR: a válaszok mentése (redaktálva); NETWORK_REPLAY_FILES: felvett válaszok
+    # visszajátszása a valódi kérések helyett (vesszővel elválasztott fájllista)
+    collector = ConversationCollector(record_dir=os.getenv("NETWORK_RECORD_DIR") or None).attach(page)
+    replay_files = [path for path in os.getenv("NETWORK_REPLAY_FILES", "").split(",") if path]
+    if replay_files:
+        replay(page, replay_files)
+    return collector
+
+if __name__ == "__main__":
+    # Felvett válaszok kiértékelése böngésző nélkül: python network_capture.py fájl1.json fájl2.json
+    collector = ConversationCollector()
+    for path in sys.argv[1:]:
+        with open(path, encoding="utf-8") as f:
+            collector.add(json.load(f))
+    stats = collector.stats() or {}
+    stats.pop("items", None)
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
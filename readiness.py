@@ -0,0 +1,59 @@
+import os
+import time
+
+# Felső korlátok másodpercben; a várakozás ennél hamarabb véget ér, ha a feltétel teljesül
+SELECTOR_TIMEOUT = float(os.getenv("WAIT_SELECTOR_TIMEOUT", "60"))
+OPTIONAL_TIMEOUT = float(os.getenv("WAIT_OPTIONAL_TIMEOUT", "15"))
+LIST_TIMEOUT = float(os.getenv("WAIT_LIST_TIMEOUT", "60"))
+# Ennyi ideig nem változhat a chat lista, hogy késznek tekintsük
+LIST_QUIET_MS = int(os.getenv("WAIT_LIST_QUIET_MS", "1500"))
+POLL_INTERVAL_MS = int(os.getenv("WAIT_POLL_INTERVAL_MS", "200"))
+
+STABLE_LIST_JS = """
+(quietMs) => {
+    const state = window.__listReadiness || (window.__listReadiness = { signature: null, since: 0 });
+    const items = document.querySelectorAll('div[role="listitem"]');
+    const badges = document.querySelectorAll('div[role="listitem"] [role="status"]');
+    const signature = items.length + ':' + badges.length;
+    const now = performance.now();
+    if (signature !== state.signature) {
+        state.signature = signature;
+        state.since = now;
+        return false;
+    }
+    return items.length > 0 && now - state.since >= quietMs;
+}
+"""
+
+def report(label, started, success):
+    elapsed = time.perf_counter() - started
+    if success:
+        print(f"Várakozás kész ({label}): {elapsed:.1f} mp")
+    else:
+        print(f"Várakozás időtúllépés ({label}): {elapsed:.1f} mp")
+    return elapsed
+
+def wait_for_selector(page, selector, label, timeout=SELECTOR_TIMEOUT, optional=False):
+    # Opcionális elemnél időtúllépéskor None, egyébként a Playwright kivétele jut tovább
+    started = time.perf_counter()
+    try:
+        element = page.wait_for_selector(selector, timeout=timeout * 1000)
+    except Exception:
+        report(label, started, False)
+        if optional:
+            return None
+        raise
+    report(label, started, True)
+    return element
+
+def wait_for_stable_list(page, label="chat lista stabil", timeout=LIST_TIMEOUT, quiet_ms=LIST_QUIET_MS):
+    # Akkor kész, ha van chat elem, és az elemek, illetve olvasatlan jelzők száma
+    # quiet_ms ideig nem változott
+    started = time.perf_counter()
+    try:
+        page.wait_for_function(STABLE_LIST_JS, arg=quiet_ms, polling=POLL_INTERVAL_MS, timeout=timeout * 1000)
+    except Exception:
+        report(label, started, False)
+        return False
+    report(label, started, True)
+    return True
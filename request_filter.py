@@ -0,0 +1,124 @@
+from fnmatch import fnmatch
+import os
+import threading
+
+# A chat lista és az olvasatlan jelzők megjelenítéséhez ezek nem kellenek
+DEFAULT_BLOCKED_TYPES = "image,media,font"
+DEFAULT_BLOCKED_PATTERNS = ",".join([
+    "*://*.events.data.microsoft.com/*",
+    "*://*.aria.microsoft.com/*",
+    "*://*.applicationinsights.azure.com/*",
+    "*://*.clarity.ms/*",
+    "*://*.google-analytics.com/*",
+    "*://*.googletagmanager.com/*",
+    "*://*.doubleclick.net/*"
+])
+
+# Becsült válaszméret bájtban, ha egy típusból még nem láttunk átengedett kérést
+DEFAULT_SIZE_ESTIMATES = {
+    "image": 25000,
+    "media": 250000,
+    "font": 40000,
+    "stylesheet": 20000,
+    "script": 60000
+}
+FALLBACK_SIZE_ESTIMATE = 1500
+
+# Az összes ellenőrzés összesített megtakarítása
+totals_lock = threading.Lock()
+totals = {
+    "checks": 0,
+    "blocked_requests": 0,
+    "allowed_requests": 0,
+    "allowed_bytes": 0,
+    "estimated_bytes_saved": 0
+}
+
+def split_setting(value):
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+class RequestFilter:
+    # Kontextus szintű kérésszűrő: erőforrás-típus és URL minta alapján eldobja
+    # a felesleges kéréseket, és számolja a megtakarítást.
+    def __init__(self, blocked_types=None, blocked_patterns=None):
+        self.blocked_types = set(blocked_types if blocked_types is not None else split_setting(DEFAULT_BLOCKED_TYPES))
+        self.blocked_patterns = list(blocked_patterns if blocked_patterns is not None else split_setting(DEFAULT_BLOCKED_PATTERNS))
+        self.blocked_requests = 0
+        self.blocked_by_type = {}
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+        self.allowed_by_type = {}
+        self.reported = False
+
+    def attach(self, context):
+        context.route("**/*", self.handle_route)
+        context.on("requestfinished", self.on_request_finished)
+
+    def is_blocked(self, request):
+        if request.resource_type in self.blocked_types:
+            return True
+        return any(fnmatch(request.url, pattern) for pattern in self.blocked_patterns)
+
+    def handle_route(self, route):
+        request = route.request
+        if self.is_blocked(request):
+            self.blocked_requests += 1
+            self.blocked_by_type[request.resource_type] = self.blocked_by_type.get(request.resource_type, 0) + 1
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    def on_request_finished(self, request):
+        try:
+            size = request.sizes()["responseBodySize"]
+        except Exception:
+            return
+        count, total = self.allowed_by_type.get(request.resource_type, (0, 0))
+        self.allowed_by_type[request.resource_type] = (count + 1, total + size)
+        self.allowed_requests += 1
+        self.allowed_bytes += size
+
+    def estimated_bytes_saved(self):
+        saved = 0
+        for resource_type, count in self.blocked_by_type.items():
+            seen_count, seen_total = self.allowed_by_type.get(resource_type, (0, 0))
+            if seen_count:
+                average = seen_total / seen_count
+            else:
+                average = DEFAULT_SIZE_ESTIMATES.get(resource_type, FALLBACK_SIZE_ESTIMATE)
+            saved += count * average
+        return int(saved)
+
+    def report(self):
+        result = {
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "allowed_requests": self.allowed_requests,
+            "allowed_bytes": self.allowed_bytes,
+            "estimated_bytes_saved": self.estimated_bytes_saved()
+        }
+        # Egy ellenőrzés eredményét csak egyszer adjuk hozzá az összesítéshez
+        if not self.reported:
+            self.reported = True
+            with totals_lock:
+                totals["checks"] += 1
+                for key in ("blocked_requests", "allowed_requests", "allowed_bytes", "estimated_bytes_saved"):
+                    totals[key] += result[key]
+        print(
+            f"Kérésszűrő: {result['blocked_requests']} kérés blokkolva "
+            f"(~{result['estimated_bytes_saved'] / 1024:.0f} KB megtakarítás), "
+            f"{result['allowed_requests']} átengedve ({result['allowed_bytes'] / 1024:.0f} KB)"
+        )
+        return result
+
+def create_request_filter():
+    if os.getenv("REQUEST_FILTER_ENABLED", "0") != "1":
+        return None
+    return RequestFilter(
+        split_setting(os.getenv("REQUEST_FILTER_TYPES", DEFAULT_BLOCKED_TYPES)),
+        split_setting(os.getenv("REQUEST_FILTER_PATTERNS", DEFAULT_BLOCKED_PATTERNS))
+    )
+
+def total_report():
+    with totals_lock:
+        return dict(totals)
@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+import psutil
+import metrics
+
+class BrowserUsage:
+    def __init__(self, processes):
+        self.processes = processes
+        self.launched_at = time.monotonic()
+        self.checks = 0
+        self.rss = 0
+        self.measured_at = 0.0
+
+class ResourceGovernor:
+    # A böngészők memóriahasználatának (RSS) és korának követése. Egy böngésző
+    # újraindul N ellenőrzés, a memóriakorlát vagy a maximális kor elérése után,
+    # és ha az összes böngésző együtt túllépi a közös korlátot, a legnagyobb indul újra.
+    def __init__(self, max_checks=0, max_rss_mb=0, max_age=0, memory_cap_mb=0, measure_interval=1.0):
+        self.max_checks = max_checks
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.max_age = max_age
+        self.memory_cap = memory_cap_mb * 1024 * 1024
+        self.measure_interval = measure_interval
+        self.browsers = {}
+        self.lock = threading.Lock()
+        # Az indítások sorban futnak, hogy az új folyamatok a megfelelő böngészőhöz kerüljenek
+        self.launch_lock = threading.Lock()
+        self.recycles = {}
+
+    def _descendants(self):
+        try:
+            return {process.pid: process for process in psutil.Process().children(recursive=True)}
+        except psutil.Error:
+            return {}
+
+    def start_driver(self, start):
+        # A Playwright (Node) meghajtó indítása is a zár alatt fut, hogy egy párhuzamos
+        # böngészőindítás ne számolja a saját folyamatai közé
+        with self.launch_lock:
+            return start()
+
+    def launch(self, start):
+        # A start() indítja a böngészőt; az indítás közben megjelent folyamatok tartoznak hozzá.
+        # Gyökér csak a már futó meghajtó (Node) által indított folyamat lehet, közvetlenül
+        # ebből a folyamatból induló (pl. egy másik szál új meghajtója) nem.
+        with self.launch_lock:
+            before = self._descendants()
+            browser = start()
+            after = self._descendants()
+        new = {pid: process for pid, process in after.items() if pid not in before}
+        roots = []
+        for process in new.values():
+            try:
+                if process.ppid() in before:
+                    roots.append(process)
+            except psutil.Error:
+                continue
+        with self.lock:
+            self.browsers[browser] = BrowserUsage(roots)
+        return browser
+
+    def forget(self, browser):
+        with self.lock:
+            self.browsers.pop(browser, None)
+
+    def record_check(self, browser):
+        with self.lock:
+            usage = self.browsers.get(browser)
+            if usage:
+                usage.checks += 1
+
+    def _measure(self, usage):
+        now = time.monotonic()
+        if now - usage.measured_at < self.measure_interval:
+            return usage.rss
+        total = 0
+        for root in usage.processes:
+            try:
+                for process in [root] + root.children(recursive=True):
+                    total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        usage.rss = total
+        usage.measured_at = now
+        return total
+
+    def total_rss(self):
+        with self.lock:
+            total = sum(self._measure(usage) for usage in self.browsers.values())
+        metrics.BROWSER_MEMORY.set(total)
+        return total
+
+    def over_cap(self):
+        return bool(self.memory_cap) and self.total_rss() > self.memory_cap
+
+    def recycle_reason(self, browser):
+        # None, ha a böngésző maradhat; egyébként az újraindítás oka
+        with self.lock:
+            usage = self.browsers.get(browser)
+            if not usage:
+                return None
+            rss = self._measure(usage)
+            if self.max_checks and usage.checks >= self.max_checks:
+                return "checks"
+            if self.max_rss and rss > self.max_rss:
+                return "memory"
+            if self.max_age and time.monotonic() - usage.launched_at > self.max_age:
+                return "age"
+        if self.over_cap() and self.largest() is browser:
+            return "memory_cap"
+        return None
+
+    def largest(self):
+        with self.lock:
+            if not self.browsers:
+                return None
+            return max(self.browsers, key=lambda browser: self._measure(self.browsers[browser]))
+
+    def record_recycle(self, reason):
+        with self.lock:
+            self.recycles[reason] = self.recycles.get(reason, 0) + 1
+        metrics.BROWSER_RECYCLES.labels(reason).inc()
+
+    def stats(self):
+        total = self.total_rss()
+        now = time.monotonic()
+        with self.lock:
+            return {
+                "memory_mb": round(total / 1024 / 1024, 1),
+                "memory_cap_mb": round(self.memory_cap / 1024 / 1024, 1) if self.memory_cap else None,
+                "recycles": dict(self.recycles),
+                "browsers": [
+                    {
+                        "rss_mb": round(usage.rss / 1024 / 1024, 1),
+                        "checks": usage.checks,
+                        "age_seconds": round(now - usage.launched_at, 1),
+                        "pids": [process.pid for process in usage.processes]
+                    }
+                    for usage in self.browsers.values()
+                ]
+            }
+
+def create_resource_governor(share=1):
+    # A közös memóriakorlát gépenként értendő; több munkafolyamatnál egyenlően osztozunk rajta
+    return ResourceGovernor(
+        max_checks=int(os.getenv("BROWSER_MAX_CHECKS", "50")),
+        max_rss_mb=float(os.getenv("BROWSER_MAX_RSS_MB", "1024")),
+        max_age=float(os.getenv("BROWSER_MAX_AGE", "3600")),
+        memory_cap_mb=float(os.getenv("BROWSER_MEMORY_CAP_MB", "0")) / max(1, share)
+    )
@@ -0,0 +1,73 @@
+from collections import OrderedDict
+import os
+import threading
+import time
+
+class ResultCache:
+    # Fiókonkénti eredmény-gyorsítótár lejárati idővel és LRU kiszorítással.
+    # A ttl után még stale_ttl ideig a régi eredmény kiszolgálható, miközben
+    # a háttérben frissül.
+    def __init__(self, ttl=60, max_size=1000, stale_ttl=0):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self.entries = OrderedDict()
+        self.refreshing = set()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        # (érték, kor másodpercben, állapot) vagy None; az állapot 'cached' vagy 'stale'
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            age = time.monotonic() - stored_at
+            if age <= self.ttl:
+                status = "cached"
+            elif age <= self.ttl + self.stale_ttl:
+                status = "stale"
+            else:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value, age, status
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def begin_refresh(self, key):
+        # Egy kulcsra egyszerre csak egy háttérfrissítés fusson
+        with self.lock:
+            if key in self.refreshing:
+                return False
+            self.refreshing.add(key)
+            return True
+
+    def end_refresh(self, key):
+        with self.lock:
+            self.refreshing.discard(key)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "refreshing": len(self.refreshing)
+            }
+
+def create_result_cache():
+    ttl = float(os.getenv("RESULT_CACHE_TTL", "60"))
+    if ttl <= 0:
+        return None
+    return ResultCache(
+        ttl=ttl,
+        max_size=int(os.getenv("RESULT_CACHE_MAX_SIZE", "1000")),
+        stale_ttl=float(os.getenv("RESULT_CACHE_STALE_TTL", "0"))
+    )
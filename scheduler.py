@@ -0,0 +1,145 @@
+import random
+import threading
+import time
+
+class AccountState:
+    def __init__(self, cred, next_run):
+        self.cred = cred
+        self.next_run = next_run
+        self.refreshing = False
+        self.last_result = None
+        self.last_refresh = None
+        self.last_duration = None
+        self.last_error = None
+        self.refresh_count = 0
+
+class StatsScheduler:
+    # A regisztrált fiókokat a háttérben, rendszeres időközönként frissíti,
+    # így az olvasó végpontok a memóriában tartott legutóbbi eredményt adják vissza.
+    # A run_check(cred) egy Future-t ad vissza (a böngészőkészlet feladatát).
+    def __init__(self, run_check, interval=300, jitter=0.1, max_concurrent=1, initial_spread=30, on_result=None):
+        self.run_check = run_check
+        self.interval = interval
+        self.jitter = jitter
+        self.max_concurrent = max(1, max_concurrent)
+        self.initial_spread = initial_spread
+        self.on_result = on_result
+        self.accounts = {}
+        self.running = 0
+        self.stopped = False
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._loop, name="stats-scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def _key(self, email):
+        return email.strip().lower()
+
+    def _next_interval(self):
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def register(self, cred):
+        # Az első frissítések véletlenszerűen szétszórva indulnak, hogy ne egyszerre fussanak
+        with self.condition:
+            key = self._key(cred.email)
+            state = self.accounts.get(key)
+            if state:
+                state.cred = cred
+            else:
+                delay = random.uniform(0, min(self.interval, self.initial_spread))
+                state = AccountState(cred, time.monotonic() + delay)
+                self.accounts[key] = state
+            self.condition.notify_all()
+            return self._describe(state)
+
+    def unregister(self, email):
+        with self.condition:
+            return self.accounts.pop(self._key(email), None) is not None
+
+    def status(self, email):
+        with self.condition:
+            state = self.accounts.get(self._key(email))
+            return self._describe(state) if state else None
+
+    def statuses(self):
+        with self.condition:
+            return [self._describe(state) for state in self.accounts.values()]
+
+    def _describe(self, state):
+        now = time.monotonic()
+        return {
+            "email": state.cred.email,
+            "stats": state.last_result,
+            "last_refresh": state.last_refresh,
+            "last_duration_seconds": state.last_duration,
+            "age_seconds": time.time() - state.last_refresh if state.last_refresh else None,
+            "next_refresh_in_seconds": None if state.refreshing else max(0.0, state.next_run - now),
+            "refreshing": state.refreshing,
+            "last_error": state.last_error,
+            "refresh_count": state.refresh_count
+        }
+
+    def _loop(self):
+        with self.condition:
+            while not self.stopped:
+                now = time.monotonic()
+                timeout = None
+                if self.running < self.max_concurrent:
+                    waiting = [state for state in self.accounts.values() if not state.refreshing]
+                    if waiting:
+                        state = min(waiting, key=lambda state: state.next_run)
+                        if state.next_run <= now:
+                            self._dispatch(state)
+                            continue
+                        timeout = state.next_run - now
+                self.condition.wait(timeout)
+
+    def _dispatch(self, state):
+        state.refreshing = True
+        self.running += 1
+        started = time.monotonic()
+        print(f"Ütemezett frissítés: {state.cred.email}")
+        try:
+            future = self.run_check(state.cred)
+        except Exception as e:
+            print(f"Hiba az ütemezett frissítés indításakor: {str(e)}")
+            self._finish(state, started, None)
+            return
+        future.add_done_callback(lambda future: self._finish(state, started, future))
+
+    def _finish(self, state, started, future):
+        result = None
+        if future is not None:
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Hiba az ütemezett frissítés során: {str(e)}")
+
+        with self.condition:
+            self.running -= 1
+            state.refreshing = False
+            state.last_duration = time.monotonic() - started
+            state.next_run = time.monotonic() + self._next_interval()
+            if result is None:
+                state.last_error = "A frissítés nem adott eredményt"
+            elif getattr(result, 'error', None):
+                # Hibás frissítésnél megtartjuk az utolsó jó eredményt
+                state.last_error = result.error
+            else:
+                state.last_result = result
+                state.last_error = None
+                state.last_refresh = time.time()
+                state.refresh_count += 1
+            self.condition.notify_all()
+
+        if result is not None and not getattr(result, 'error', None) and self.on_result:
+            self.on_result(state.cred, result)
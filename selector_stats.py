@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+
+class SelectorStats:
+    # Olvasatlan-jelző szelektorok találati statisztikája, JSON fájlban megőrizve.
+    # A szkennelés a szelektorokat a közelmúltbeli találati arány szerint próbálja.
+    # A tartósan halottak kihagyása (skip_dead) csak kérésre: a statisztika a folyamat
+    # összes fiókjáé, így egy csak néhány fióknál (nyelv, felületváltozat) találó szelektor
+    # is "halottnak" tűnhet. Kihagyásnál is minden probe_every-edik szkennelés teljes
+    # próba, így egy felületváltozás után az új jelző is újra előkerül.
+    def __init__(self, path, dead_after=20, probe_every=10, decay=0.9, save_interval=30, skip_dead=False):
+        self.path = path
+        self.skip_dead = skip_dead
+        self.dead_after = dead_after
+        self.probe_every = max(1, probe_every)
+        self.decay = decay
+        self.save_interval = save_interval
+        self.scans = 0
+        # Csak azok a szkennelések számítanak, ahol bármelyik szelektor talált
+        self.productive = 0
+        self.selectors = {}
+        self.saved_at = 0.0
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.scans = data.get("scans", 0)
+            self.productive = data.get("productive", 0)
+            self.selectors = data.get("selectors", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Hiba a szelektor statisztika betöltése során: {str(e)}")
+
+    def _entry(self, selector):
+        return self.selectors.setdefault(selector, {"hits": 0, "score": 0.0, "last_hit": None})
+
+    def _dead(self, selector):
+        entry = self.selectors.get(selector)
+        last_hit = entry["last_hit"] if entry and entry["last_hit"] is not None else -1
+        return self.productive - last_hit > self.dead_after
+
+    def plan(self, selectors):
+        # (szelektorok próbálási sorrendben, teljes próba-e)
+        with self.lock:
+            self.scans += 1
+            probe = (not self.skip_dead or self.productive < self.dead_after
+                     or self.scans % self.probe_every == 0)
+            ranked = sorted(selectors, key=lambda selector: -self._entry(selector)["score"])
+            if probe:
+                return ranked, True
+            live = [selector for selector in ranked if not self._dead(selector)]
+            return (live or ranked), False
+
+    def record(self, hits):
+        # hits: {szelektor: találatok száma} egy szkennelésből
+        hits = {selector: count for selector, count in (hits or {}).items() if count}
+        with self.lock:
+            if hits:
+                self.productive += 1
+                for entry in self.selectors.values():
+                    entry["score"] *= self.decay
+                for selector, count in hits.items():
+                    entry = self._entry(selector)
+                    entry["hits"] += count
+                    entry["score"] += count
+                    entry["last_hit"] = self.productive
+            self.dirty = True
+            due = time.monotonic() - self.saved_at >= self.save_interval
+        if due:
+            self.save()
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {"scans": self.scans, "productive": self.productive, "selectors": self.selectors}
+            self.dirty = False
+            self.saved_at = time.monotonic()
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Atomikus csere, hogy párhuzamos olvasó ne lásson félig írt fájlt
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Hiba a szelektor statisztika mentése során: {str(e)}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "scans": self.scans,
+                "productive_scans": self.productive,
+                "selectors": [
+                    {
+                        "selector": selector,
+                        "hits": entry["hits"],
+                        "score": round(entry["score"], 2),
+                        "dead": self._dead(selector)
+                    }
+                    for selector, entry in sorted(self.selectors.items(), key=lambda item: -item[1]["score"])
+                ]
+            }
+
+shared_stats = None
+shared_lock = threading.Lock()
+
+def get_selector_stats():
+    # Folyamatonként egy közös példány; kikapcsolva None
+    global shared_stats
+    if os.getenv("SELECTOR_STATS_ENABLED", "1") != "1":
+        return None
+    with shared_lock:
+        if shared_stats is None:
+            shared_stats = SelectorStats(
+                os.getenv("SELECTOR_STATS_PATH", ".selector_stats.json"),
+                dead_after=int(os.getenv("SELECTOR_STATS_DEAD_AFTER", "20")),
+                probe_every=int(os.getenv("SELECTOR_STATS_PROBE_EVERY", "10")),
+                skip_dead=os.getenv("SELECTOR_STATS_SKIP_DEAD", "0") == "1"
+            )
+        return shared_stats
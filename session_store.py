@@ -0,0 +1,161 @@
+from cryptography.fernet import Fernet, InvalidToken
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+
+class SessionStore:
+    # Bejelentkezett munkamenetek (Playwright storage state) titkosított tárolása
+    # helyi lemezen, fiókonként egy fájlban, lejárati idővel és méretkorláttal.
+    def __init__(self, directory, key=None, key_path=None, ttl=12 * 3600, max_entries=500):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        if not key:
+            key = self._load_or_create_key(key_path or default_key_path())
+        self._remove_legacy_key()
+        self.fernet = Fernet(key)
+
+    def _legacy_key_path(self):
+        # Korábban a kulcs a munkamenetek mellett volt, így a könyvtárral együtt ki is került
+        return os.path.join(self.directory, '.key')
+
+    def _remove_legacy_key(self):
+        # Áthelyezés után, vagy ha kifejezett SESSION_CACHE_KEY van megadva (azzal a régi
+        # kulccsal titkosított munkamenetek úgysem olvashatók), a régi kulcs nem maradhat ott
+        legacy_path = self._legacy_key_path()
+        if os.path.exists(legacy_path):
+            print("A munkamenet-könyvtárban tárolt régi kulcs törlése")
+            self._remove(legacy_path)
+
+    def _load_or_create_key(self, key_path):
+        # A kulcs a munkamenet-könyvtáron kívül van; ha még nincs, a régi, könyvtárbeli kulcs
+        # költözik oda (így a mentett munkamenetek megmaradnak), különben új generálódik.
+        # Több, egyszerre induló munkafolyamatnál az elsőként létrehozott kulcs marad meg.
+        if not os.path.exists(key_path):
+            legacy_path = self._legacy_key_path()
+            try:
+                with open(legacy_path, 'rb') as f:
+                    legacy_key = f.read().strip()
+            except FileNotFoundError:
+                # Nincs régi kulcs, vagy egy másik folyamat már áthelyezte
+                legacy_key = None
+            if legacy_key:
+                if self._publish_key(key_path, legacy_key):
+                    print(f"A munkamenetek kulcsa áthelyezve: {key_path}")
+            elif not os.path.exists(key_path) and self._publish_key(key_path, Fernet.generate_key()):
+                print(f"Figyelem: nincs megadva SESSION_CACHE_KEY, új kulcs generálva: {key_path}")
+        with open(key_path, 'rb') as f:
+            return f.read().strip()
+
+    def _publish_key(self, key_path, key):
+        # Atomikus létrehozás: ideiglenes fájl, majd link a végleges névre; False, ha már létezett
+        directory = os.path.dirname(key_path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        tmp_path = f"{key_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key)
+        try:
+            os.link(tmp_path, key_path)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            self._remove(tmp_path)
+
+    def _path(self, email):
+        name = hashlib.sha256(email.strip().lower().encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{name}.session")
+
+    def _password_hash(self, password, salt):
+        return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 100000).hex()
+
+    def load(self, email, password):
+        # Csak akkor adjuk vissza a munkamenetet, ha a jelszó is egyezik a mentéskorival
+        path = self._path(email)
+        try:
+            with open(path, 'rb') as f:
+                entry = json.loads(self.fernet.decrypt(f.read()))
+        except FileNotFoundError:
+            return None
+        except (InvalidToken, ValueError) as e:
+            print(f"Sérült munkamenet-fájl törlése: {str(e) or type(e).__name__}")
+            self.invalidate(email)
+            return None
+
+        if time.time() - entry['saved_at'] > self.ttl:
+            print("A mentett munkamenet lejárt")
+            self.invalidate(email)
+            return None
+
+        expected = self._password_hash(password, bytes.fromhex(entry['salt']))
+        if not hmac.compare_digest(expected, entry['password_hash']):
+            return None
+        return entry['state']
+
+    def save(self, email, password, state):
+        salt = os.urandom(16)
+        entry = {
+            'saved_at': time.time(),
+            'salt': salt.hex(),
+            'password_hash': self._password_hash(password, salt),
+            'state': state
+        }
+        path = self._path(email)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.fernet.encrypt(json.dumps(entry).encode('utf-8')))
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def invalidate(self, email):
+        self._remove(self._path(email))
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        # Lejárt bejegyzések törlése, majd a legrégebbiek eltávolítása a méretkorlát felett
+        with self.lock:
+            now = time.time()
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith('.session'):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    mtime = os.path.getmtime(path)
+                except FileNotFoundError:
+                    continue
+                if now - mtime > self.ttl:
+                    self._remove(path)
+                else:
+                    entries.append((mtime, path))
+
+            entries.sort()
+            for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+                self._remove(path)
+
+def default_key_path():
+    return os.path.join(os.path.expanduser("~"), ".config", "skype-stats", "session.key")
+
+def create_session_store():
+    if os.getenv("SESSION_CACHE_ENABLED", "1") != "1":
+        return None
+    return SessionStore(
+        os.getenv("SESSION_CACHE_DIR", ".sessions"),
+        key=os.getenv("SESSION_CACHE_KEY"),
+        key_path=os.getenv("SESSION_CACHE_KEY_FILE"),
+        ttl=int(os.getenv("SESSION_CACHE_TTL", str(12 * 3600))),
+        max_entries=int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "500"))
+    )
@@ -0,0 +1,77 @@
+from concurrent.futures import Future
+import threading
+
+class SingleFlight:
+    # Ugyanarra a kulcsra egyszerre csak egy ellenőrzés fut; a közben érkező
+    # hívók ugyanazt a future-t kapják, és annak eredményén osztoznak. Ha a futó
+    # hívás lejárata (expires_at, None: nincs) korábbi a hívóénál, a hívó nem indít
+    # párhuzamosan másodikat (az egy fióknál két egyidejű bejelentkezés lenne), hanem
+    # megvárja: ha az eredmény használható (usable), azt kapja, különben utána indul új hívás.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.started = 0
+        self.joined = 0
+        self.queued = 0
+
+    def do(self, key, start, expires_at=None, usable=None):
+        # A start() egy Future-t ad vissza; (future, shared) a visszatérési érték
+        with self.lock:
+            call = self.calls.get(key)
+            # A már befejezett, de még nem törölt hívás nem számít futónak
+            if call is not None and not call[0].done():
+                future, running_expires_at = call
+                self.joined += 1
+                if covers(running_expires_at, expires_at):
+                    return future, True
+                self.queued += 1
+                follow = Future()
+                future.add_done_callback(lambda running: self._follow(key, start, expires_at, usable, running, follow))
+                return follow, True
+            future = start()
+            self.calls[key] = (future, expires_at)
+            self.started += 1
+        future.add_done_callback(lambda future: self._forget(key, future))
+        return future, False
+
+    def _follow(self, key, start, expires_at, usable, running, follow):
+        # A korábbi lejáratú hívás után (a _forget már törölte): az eredménye, vagy új hívás
+        try:
+            value = running.result()
+            if usable is None or usable(value):
+                follow.set_result(value)
+                return
+        except Exception:
+            pass
+        try:
+            future, _ = self.do(key, start, expires_at, usable)
+        except Exception as e:
+            follow.set_exception(e)
+            return
+        future.add_done_callback(lambda future: transfer(future, follow))
+
+    def _forget(self, key, future):
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None and call[0] is future:
+                del self.calls[key]
+
+    def stats(self):
+        with self.lock:
+            return {
+                "in_flight": len(self.calls),
+                "started": self.started,
+                "joined": self.joined,
+                "queued": self.queued
+            }
+
+def covers(running_expires_at, expires_at):
+    if running_expires_at is None:
+        return True
+    return expires_at is not None and running_expires_at >= expires_at
+
+def transfer(source, target):
+    try:
+        target.set_result(source.result())
+    except Exception as e:
+        target.set_exception(e)
@@ -4,158 +4,321 @@ import os
 from dotenv import load_dotenv
 import time
 import re
+import readiness
+import unread_tracker
+import lean_scan
+import list_harvest
+import network_capture
+from request_filter import create_request_filter
+from debug_capture import get_debug_capture
+from selector_stats import get_selector_stats
+from conversation_details import conversation_rows
+import metrics
+from deadline import Deadline, DeadlineExceeded
+
+# A Skype webes felület címe (mérésekhez helyi utánzatra állítható)
+SKYPE_URL = os.getenv("SKYPE_URL", "https://web.skype.com")
+
+# Chromium indítási paraméterek (az API böngészőkészlete is ezeket használja)
+BROWSER_ARGS = [
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-extensions',
+    '--disable-notifications',
+    '--disable-gpu',  # GPU kikapcsolása headless módban
+    '--window-size=1920,1080',
+    '--disable-setuid-sandbox',
+    '--single-process',  # Egyetlen folyamat használata
+    '--no-zygote',  # Zygote process kikapcsolása
+    '--disable-accelerated-2d-canvas',  # 2D gyorsítás kikapcsolása
+    '--disable-web-security',  # Biztonsági korlátozások kikapcsolása
+    '--disable-features=IsolateOrigins,site-per-process'  # Process isolation kikapcsolása
+]
+
+# Egy folyamatban elég egyszer ellenőrizni (az API ezt indításkor teszi meg)
+browser_checked = False
+
+def ensure_browser_installed():
+    global browser_checked
+    if browser_checked:
+        return
+    browser_path = os.path.join(os.getenv('PLAYWRIGHT_BROWSERS_PATH', ''), 'chromium-1105/chrome-linux/chrome')
+    print(f"Böngésző útvonala: {browser_path}")
+    
+    if not os.path.exists(browser_path):
+        print("Böngésző telepítése...")
+        import subprocess
+        subprocess.run(['playwright', 'install', 'chromium'], check=True)
+    browser_checked = True
+
+def launch_browser(playwright):
+    # Böngésző indítása headless módban
+    ensure_browser_installed()
+    with metrics.phase("launch"):
+        browser = playwright.chromium.launch(
+            headless=True,  # Headless mód bekapcsolása
+            args=BROWSER_ARGS
+        )
+    metrics.ACTIVE_BROWSERS.inc()
+    browser.on("disconnected", lambda browser: metrics.ACTIVE_BROWSERS.dec())
+    return browser
 
 class SkypeReader:
-    def __init__(self):
-        self.playwright = sync_playwright().start()
+    # Olvasatlan üzenet jelzők a chat elemeken belül (a követő mód is ezeket használja)
+    UNREAD_INDICATORS = [
+        '.css-1dbjc4n.r-1awozwy.r-1mlx99i.r-1867qdf.r-1yadl64.r-1777fci.r-285fr0.r-s1qlax',
+        '.css-901oao.r-jwli3a.r-1bhw0zn.r-10x49cs.r-b88u0q.r-1cwl3u0',
+        '[role="status"]'
+    ]
+    # Engedékeny módban a nem tisztán számjegyes és a szöveges jelzők is számítanak
+    LENIENT_INDICATORS = False
+    
+    def __init__(self, browser=None, storage_state=None, request_filter=None, deadline=None):
+        # Ha kapunk már futó böngészőt, csak saját kontextust nyitunk rajta
+        self.playwright = None
+        self.owns_browser = browser is None
+        self.browser = browser
+        self.context_setup_seconds = None
+        # A kérés időkerete: minden várakozás és újrapróbálkozás legfeljebb eddig tart
+        self.deadline = deadline or Deadline()
+        # Mentett munkamenet (sütik + local storage) visszaállításához
+        self.storage_state = storage_state
+        self.session_restored = False
+        self.session_rejected = False
+        # Tartalék oldal: a bejelentkezési űrlap már be van töltve (lásd preload_login)
+        self.preloaded_at = None
+        # Opcionális kérésszűrő (képek, betűtípusok, telemetria eldobása)
+        self.request_filter = request_filter
+        # 'full': teljes DOM szkennelés; 'tracker': MutationObserver alapú növekményes követés
+        # (egy ellenőrzésen belül: a kontextus minden ellenőrzés végén bezárul);
+        # 'lean': egymenetes, tömör eredményt adó szkennelés;
+        # 'harvest': a virtualizált lista végiggörgetése, minden beszélgetés összegyűjtése;
+        # 'network': a kliens beszélgetés-lista válaszainak (XHR/fetch JSON) feldolgozása
+        self.extraction_mode = os.getenv("EXTRACTION_MODE", "full")
+        self.conversations = None
+        # Szelektor találati statisztika (adaptív jelzősorrend); kikapcsolva None
+        self.selector_stats = get_selector_stats()
+        # Debug mentés csak bekapcsolt DEBUG_CAPTURE_MODE esetén
+        self.debug_capture = get_debug_capture()
+        self.debug_run = None
+        self.account = None
+        if self.owns_browser:
+            self.playwright = sync_playwright().start()
         self.setup_browser()
         
     def setup_browser(self):
         try:
-            # Böngésző indítása headless módban
-            browser_path = os.path.join(os.getenv('PLAYWRIGHT_BROWSERS_PATH', ''), 'chromium-1105/chrome-linux/chrome')
-            print(f"Böngésző útvonala: {browser_path}")
+            if self.owns_browser:
+                self.browser = launch_browser(self.playwright)
             
-            if not os.path.exists(browser_path):
-                print("Böngésző telepítése...")
-                import subprocess
-                subprocess.run(['playwright', 'install', 'chromium'], check=True)
+            context_started = time.perf_counter()
+            with metrics.phase("setup"):
+                # Új kontextus létrehozása egyedi beállításokkal
+                self.context = self.browser.new_context(
+                    viewport={'width': 1920, 'height': 1080},
+                    user_agent='Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+                    ignore_https_errors=True,
+                    java_script_enabled=True,
+                    bypass_csp=True,
+                    extra_http_headers={
+                        'Accept-Language': 'hu-HU,hu;q=0.9,en-US;q=0.8,en;q=0.7'
+                    },
+                    storage_state=self.storage_state
+                )
             
-            self.browser = self.playwright.chromium.launch(
-                headless=True,  # Headless mód bekapcsolása
-                args=[
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-extensions',
-                    '--disable-notifications',
-                    '--disable-gpu',  # GPU kikapcsolása headless módban
-                    '--window-size=1920,1080',
-                    '--disable-setuid-sandbox',
-                    '--single-process',  # Egyetlen folyamat használata
-                    '--no-zygote',  # Zygote process kikapcsolása
-                    '--disable-accelerated-2d-canvas',  # 2D gyorsítás kikapcsolása
-                    '--disable-web-security',  # Biztonsági korlátozások kikapcsolása
-                    '--disable-features=IsolateOrigins,site-per-process'  # Process isolation kikapcsolása
-                ]
-            )
+                if self.request_filter:
+                    self.request_filter.attach(self.context)
             
-            # Új kontextus létrehozása egyedi beállításokkal
-            self.context = self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-                ignore_https_errors=True,
-                java_script_enabled=True,
-                bypass_csp=True,
-                extra_http_headers={
-                    'Accept-Language': 'hu-HU,hu;q=0.9,en-US;q=0.8,en;q=0.7'
-                }
-            )
+                # Új oldal létrehozása
+                self.page = self.context.new_page()
+                self.page.set_default_timeout(120000)  # Timeout növelése 120 másodpercre
+            
+                # Hálózati módban már az első navigáció előtt figyeljük a válaszokat
+                if self.extraction_mode == "network":
+                    self.conversations = network_capture.attach(self.page)
             
-            # Új oldal létrehozása
-            self.page = self.context.new_page()
-            self.page.set_default_timeout(120000)  # Timeout növelése 120 másodpercre
+                # JavaScript kód injektálása az automatizálás elrejtéséhez
+                self.page.add_init_script("""
+                    Object.defineProperty(navigator, 'webdriver', {
+                        get: () => undefined
+                    });
+                """)
             
-            # JavaScript kód injektálása az automatizálás elrejtéséhez
-            self.page.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-            """)
+            metrics.ACTIVE_CONTEXTS.inc()
+            self.context_setup_seconds = time.perf_counter() - context_started
             
         except Exception as e:
             print(f"Hiba a böngésző inicializálása során: {str(e)}")
             raise
         
+    def wait_for(self, selector, label, timeout=readiness.SELECTOR_TIMEOUT, optional=False):
+        return readiness.wait_for_selector(self.page, selector, label, timeout=self.deadline.cap(timeout), optional=optional)
+    
+    def check_deadline(self, error):
+        # A lejárt határidő miatti hiba nem bejelentkezési hiba: továbbadjuk a hívónak
+        if isinstance(error, DeadlineExceeded) or self.deadline.expired():
+            raise DeadlineExceeded("A kérés határideje lejárt") from error
+    
     def login(self, username, password):
+        self.account = username
         try:
-            print("Skype weboldal betöltése...")
-            self.page.goto("https://web.skype.com", wait_until="networkidle", timeout=120000)
-            time.sleep(10)
-            
-            print("Várakozás a bejelentkezési mezőre...")
-            self.page.wait_for_selector('input[name="loginfmt"]', timeout=120000)
-            print("Email cím megadása...")
-            self.page.fill('input[name="loginfmt"]', username)
-            time.sleep(2)
-            
-            print("Következő gomb kattintása...")
-            self.page.click('#idSIButton9')
-            time.sleep(5)
-            
-            print("Várakozás a jelszó mezőre...")
-            self.page.wait_for_selector('input[name="passwd"]', timeout=120000)
-            print("Jelszó megadása...")
-            self.page.fill('input[name="passwd"]', password)
-            time.sleep(2)
+            self.page.set_default_timeout(self.deadline.cap_ms(120))
+            if self.preloaded_at is None:
+                print("Skype weboldal betöltése...")
+                with metrics.phase("navigation"):
+                    self.page.goto(SKYPE_URL, wait_until="domcontentloaded", timeout=self.deadline.cap_ms(120))
+            else:
+                print(f"Előre betöltött bejelentkezési oldal ({time.monotonic() - self.preloaded_at:.0f} mp régi)")
             
-            print("Bejelentkezés gomb kattintása...")
-            self.page.click('#idSIButton9')
-            time.sleep(5)
+            if self.storage_state and self.resume_session():
+                return True
             
-            print("Várakozás a 'Bejelentkezve maradás' ablakra...")
-            try:
-                time.sleep(10)
-                checkbox = self.page.wait_for_selector('[name="DontShowAgain"]', timeout=30000)
-                if checkbox:
+            with metrics.phase("credentials"):
+                print("Várakozás a bejelentkezési mezőre...")
+                self.wait_for('input[name="loginfmt"]', "bejelentkezési mező")
+                print("Email cím megadása...")
+                self.page.fill('input[name="loginfmt"]', username)
+                
+                print("Következő gomb kattintása...")
+                self.page.click('#idSIButton9')
+                
+                print("Várakozás a jelszó mezőre...")
+                self.wait_for('input[name="passwd"]', "jelszó mező")
+                print("Jelszó megadása...")
+                self.page.fill('input[name="passwd"]', password)
+                
+                print("Bejelentkezés gomb kattintása...")
+                self.page.click('#idSIButton9')
+                
+                # A 'Bejelentkezve maradás' ablak vagy rögtön a chat lista jön
+                print("Várakozás a 'Bejelentkezve maradás' ablakra...")
+                element = self.wait_for(
+                    '[name="DontShowAgain"], div[role="list"]',
+                    "bejelentkezve maradás / chat lista",
+                    timeout=readiness.OPTIONAL_TIMEOUT,
+                    optional=True
+                )
+                if element and element.get_attribute('name') == 'DontShowAgain':
                     print("Checkbox megtalálva, kattintás...")
-                    checkbox.click()
-                    time.sleep(2)
+                    element.click()
                     self.page.keyboard.press('Enter')
-                    time.sleep(10)
-            except:
-                print("Nem található 'Bejelentkezve maradás' ablak")
+                elif not element:
+                    print("Nem található 'Bejelentkezve maradás' ablak")
             
-            print("Várakozás a főoldal betöltésére...")
-            time.sleep(30)
-            
-            # Várjuk meg, hogy a chat lista megjelenjen
-            print("Chat lista keresése...")
-            chat_list = None
-            retry_count = 0
-            max_retries = 3
-            
-            while retry_count < max_retries:
-                try:
-                    chat_list = self.page.wait_for_selector('div[role="list"]', timeout=60000)
-                    if chat_list:
-                        print("Chat lista megtalálva")
-                        break
-                except:
-                    print(f"Chat lista nem található, újrapróbálkozás ({retry_count + 1}/{max_retries})...")
-                    self.page.reload(wait_until="networkidle", timeout=120000)
-                    time.sleep(20)
-                    retry_count += 1
-            
-            if not chat_list:
-                print("Nem található chat lista")
-                return False
-                
-            print("Oldal frissítése és várakozás a chat elemekre...")
-            self.page.reload(wait_until="networkidle", timeout=120000)
-            time.sleep(20)
-            
-            # Várjuk meg, hogy legalább egy chat elem megjelenjen
-            try:
-                print("Chat elemek keresése...")
-                chat_items = self.page.wait_for_selector('div[role="listitem"]', timeout=60000)
-                if chat_items:
-                    print("Chat elemek megtalálva")
-                    time.sleep(10)  # Várunk még, hogy minden elem betöltődjön
-            except:
-                print("Nem találhatók chat elemek")
-                return False
-            
-            return True
+            with metrics.phase("list_wait"):
+                return self.wait_for_chat_list()
             
         except Exception as e:
+            self.check_deadline(e)
             print(f"Hiba történt a bejelentkezés során: {str(e)}")
+            metrics.FAILURES.labels(metrics.failure_type(e)).inc()
+            self.capture_debug("login", False, {"error": str(e)})
+            return False
+    
+    def preload_login(self):
+        # Tartalék oldal előkészítése: betöltés a bejelentkezési űrlapig, a login() innen folytatja
+        with metrics.phase("navigation"):
+            self.page.goto(SKYPE_URL, wait_until="domcontentloaded", timeout=self.deadline.cap_ms(120))
+        self.wait_for('input[name="loginfmt"]', "bejelentkezési mező")
+        self.preloaded_at = time.monotonic()
+    
+    def wait_for_chat_list(self):
+        # Hálózati módban a beszélgetés-válasz megérkezése jelzi a bejelentkezett állapotot;
+        # a DOM listára (és az oldal újratöltésére) csak akkor kerül sor, ha válasz nem jön
+        if self.extraction_mode == "network" and self.conversations is not None:
+            if self.conversations.wait_for_response(self.page, timeout=self.deadline.cap(readiness.LIST_TIMEOUT)):
+                print("Beszélgetés-válasz megérkezett")
+                return True
+            print("Nem érkezett beszélgetés-válasz, a chat lista keresése...")
+        
+        # Várjuk meg, hogy a chat lista megjelenjen
+        print("Chat lista keresése...")
+        chat_list = None
+        retry_count = 0
+        max_retries = 3
+        
+        while retry_count < max_retries:
+            chat_list = self.wait_for('div[role="list"]', "chat lista", optional=True)
+            if chat_list:
+                print("Chat lista megtalálva")
+                break
+            print(f"Chat lista nem található, újrapróbálkozás ({retry_count + 1}/{max_retries})...")
+            metrics.RETRIES.labels("list_wait").inc()
+            self.page.reload(wait_until="domcontentloaded", timeout=self.deadline.cap_ms(120))
+            retry_count += 1
+        
+        if not chat_list:
+            print("Nem található chat lista")
+            metrics.FAILURES.labels("chat_list_missing").inc()
+            self.capture_debug("login", False)
+            return False
+        
+        # A lista megjelenése után (az eredeti viselkedés szerint) mindig frissítünk: az első
+        # betöltés után a chat elemek és az olvasatlan jelzők nem mindig teljesek
+        print("Oldal frissítése és várakozás a chat elemekre...")
+        self.page.reload(wait_until="domcontentloaded", timeout=self.deadline.cap_ms(120))
+        
+        # Várjuk meg, hogy legalább egy chat elem megjelenjen
+        print("Chat elemek keresése...")
+        chat_items = self.wait_for('div[role="listitem"]', "chat elemek", optional=True)
+        if not chat_items:
+            print("Nem találhatók chat elemek")
+            metrics.FAILURES.labels("chat_items_missing").inc()
+            self.capture_debug("login", False)
             return False
+        
+        print("Chat elemek megtalálva")
+        return True
+            
+    def resume_session(self):
+        # Mentett munkamenettel vagy rögtön a chat lista jelenik meg, vagy a bejelentkezési űrlap
+        print("Mentett munkamenet ellenőrzése...")
+        with metrics.phase("list_wait"):
+            if self.extraction_mode == "network" and self.conversations is not None:
+                # Hálózati módban a beszélgetés-válasz is érvényes munkamenetet jelez
+                restored = self.conversations.wait_for_response(
+                    self.page,
+                    timeout=self.deadline.cap(readiness.SELECTOR_TIMEOUT),
+                    selector='input[name="loginfmt"]'
+                ) == "response"
+            else:
+                element = self.wait_for(
+                    'div[role="listitem"], input[name="loginfmt"]',
+                    "mentett munkamenet",
+                    optional=True
+                )
+                restored = bool(element) and element.get_attribute('name') != 'loginfmt'
+        
+        if restored:
+            print("Mentett munkamenet érvényes, bejelentkezés kihagyva")
+            self.session_restored = True
+            return True
+        
+        print("Mentett munkamenet lejárt vagy elutasítva, teljes bejelentkezés...")
+        self.session_rejected = True
+        return False
+    
+    def capture_debug(self, attempt, success, debug_info=None):
+        # Debug mentés (HTML + kiolvasott adatok) a háttérben, ha a mód kéri
+        if not self.debug_capture:
+            return
+        if self.debug_run is None:
+            self.debug_run = self.debug_capture.start_run(self.account)
+        if self.debug_run.wants(success):
+            try:
+                self.debug_run.save(attempt, self.page.content(), debug_info)
+            except Exception as e:
+                print(f"Hiba a debug mentés során: {str(e)}")
+    
+    def export_session(self):
+        return self.context.storage_state()
             
     def get_message_stats(self):
         try:
             print("Várakozás a beszélgetések betöltésére...")
-            time.sleep(20)
+            with metrics.phase("stats_wait"):
+                self.wait_for_list_data()
             
             # Próbáljuk meg többször is lekérni a chat elemeket
             retry_count = 0
@@ -163,47 +326,110 @@ class SkypeReader:
             debug_info = None
             
             while retry_count < max_retries:
-                # HTML tartalom mentése debuggoláshoz
-                html_content = self.page.content()
-                with open(f'debug_page_{retry_count}.html', 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-                print(f"HTML tartalom elmentve a debug_page_{retry_count}.html fájlba")
-                
-                # JavaScript kód futtatása
-                print(f"JavaScript kód futtatása (próbálkozás {retry_count + 1}/{max_retries})...")
-                debug_info = self.page.evaluate(self.get_messages_js_code())
+                # Chat lista kiolvasása a választott módban
+                print(f"Chat lista kiolvasása ({self.extraction_mode} mód, próbálkozás {retry_count + 1}/{max_retries})...")
+                with metrics.phase("extraction"):
+                    debug_info = self.extract_stats()
                 
-                # Debug információk mentése fájlba
-                with open(f'debug_info_{retry_count}.json', 'w', encoding='utf-8') as f:
-                    f.write(str(debug_info))
-                print(f"Debug információk elmentve a debug_info_{retry_count}.json fájlba")
+                self.capture_debug(retry_count, bool(debug_info and debug_info['totalChats'] > 0), debug_info)
                 
                 if debug_info and debug_info['totalChats'] > 0:
                     print(f"Sikeresen találtunk {debug_info['totalChats']} chat elemet")
                     break
                 
                 print("Nem találtunk chat elemeket, újrapróbálkozás...")
-                self.page.reload(wait_until="networkidle", timeout=120000)
-                time.sleep(20)
+                metrics.RETRIES.labels("extraction").inc()
+                with metrics.phase("stats_wait"):
+                    if self.extraction_mode == "tracker" and retry_count == 0:
+                        # A követő magától frissül, elég megvárni, hogy a lista megálljon
+                        self.wait_for_list_data()
+                    else:
+                        self.page.reload(wait_until="domcontentloaded", timeout=self.deadline.cap_ms(120))
+                        self.wait_for_list_data()
                 retry_count += 1
             
             if not debug_info or debug_info['totalChats'] == 0:
                 print("Nem sikerült chat elemeket találni")
+                metrics.FAILURES.labels("no_chats").inc()
                 return None
             
             return {
                 "total_messages": debug_info['totalChats'],
                 "unread_messages": debug_info['unreadCount'],
-                "oldest_unread_date": debug_info['oldestUnreadDate']
+                "oldest_unread_date": debug_info['oldestUnreadDate'],
+                "conversations": conversation_rows(debug_info)
             }
             
         except Exception as e:
+            self.check_deadline(e)
             print(f"Hiba történt az üzenetek lekérdezése során: {str(e)}")
+            metrics.FAILURES.labels(metrics.failure_type(e)).inc()
             return None
             
+    def wait_for_list_data(self):
+        # Hálózati módban a beszélgetés-válaszokra várunk, a DOM kirajzolására nem
+        timeout = self.deadline.cap(readiness.LIST_TIMEOUT)
+        if self.extraction_mode == "network" and self.conversations is not None:
+            return self.conversations.wait(self.page, timeout=timeout)
+        return readiness.wait_for_stable_list(self.page, timeout=timeout)
+    
+    def extract_stats(self):
+        if self.extraction_mode == "network" and self.conversations is not None:
+            stats = self.conversations.stats()
+            if stats:
+                return stats
+            # Ha a kliens nem küldött (felismerhető) választ, a DOM-ból olvasunk
+        if self.extraction_mode == "tracker":
+            tracked = self.read_tracked_stats()
+            if tracked:
+                return self.record_selector_hits(tracked)
+        selectors, first_hit = self.indicator_plan()
+        if self.extraction_mode == "tracker":
+            stats = self.install_unread_tracker(selectors, first_hit)
+        elif self.extraction_mode in ("lean", "network"):
+            stats = lean_scan.scan(self.page, selectors, self.LENIENT_INDICATORS)
+        elif self.extraction_mode == "harvest":
+            stats = list_harvest.harvest(
+                self.page, selectors, self.LENIENT_INDICATORS, first_hit=first_hit, remaining=self.deadline.remaining()
+            )
+            if stats.get("truncated"):
+                print(f"A lista görgetése a határidő miatt félbeszakadt ({stats['totalChats']} beszélgetés)")
+            if stats.get("exact") is False:
+                print("Azonosító nélküli chat elemek: a beszélgetések száma nem pontos")
+        else:
+            stats = self.page.evaluate(self.get_messages_js_code(), {"selectors": selectors, "firstHit": first_hit})
+        return self.record_selector_hits(stats)
+    
+    def indicator_plan(self):
+        # (szelektorok, első találatnál megálljon-e): statisztika esetén a megfigyelt
+        # találati arány szerinti sorrend. Elemenként csak a halott szelektorok kihagyásakor
+        # állunk meg az első találatnál; a teljes próbák minden találó szelektort rögzítenek,
+        # így a tartalék szelektorok sem "halnak meg" csak azért, mert nem az elsők
+        if not self.selector_stats:
+            return self.UNREAD_INDICATORS, False
+        selectors, probe = self.selector_stats.plan(self.UNREAD_INDICATORS)
+        if not self.selector_stats.skip_dead:
+            return selectors, False
+        if probe:
+            print("Teljes szelektor próba (minden olvasatlan-jelző kipróbálva)")
+        return selectors, not probe
+    
+    def record_selector_hits(self, stats):
+        if self.selector_stats and stats and "selectorHits" in stats:
+            self.selector_stats.record(stats["selectorHits"])
+        return stats
+    
+    def install_unread_tracker(self, selectors, first_hit=False):
+        # Egyszeri teljes bejárás, utána csak a megváltozott chat elemeket számolja újra
+        return unread_tracker.install(self.page, selectors, self.LENIENT_INDICATORS, first_hit=first_hit)
+    
+    def read_tracked_stats(self):
+        # Olcsó kiolvasás: a követő aktuális összesítése, újraszkennelés nélkül
+        return unread_tracker.read(self.page)
+    
     def get_messages_js_code(self):
         return """
-        () => {
+        (config) => {
             // Keressük a chat elemeket
             const chatItems = Array.from(document.querySelectorAll('div[role="listitem"]'));
             console.log('Talált chat elemek száma:', chatItems.length);
@@ -216,12 +442,14 @@ class SkypeReader:
             chatItems.forEach((item, index) => {
                 const itemInfo = {
                     index,
+                    id: item.getAttribute('data-id') || item.id || String(index),
                     classes: item.className,
                     text: item.textContent,
                     hasUnread: false,
                     unreadCount: 0,
                     date: null,
-                    fullDate: null
+                    fullDate: null,
+                    hits: []
                 };
                 
                 // Keressük a dátumot az aria-label attribútumból
@@ -234,7 +462,8 @@ class SkypeReader:
                     const timeMatch = ariaLabel.match(/(\d{1,2}:\d{2})/);
                     
                     // Keressük a mai/tegnapi/stb. jelzőket is
-                    const dayMatch = ariaLabel.match(/(ma|tegnap|tegnapelőtt)/i);
+                    // A hosszabb alak előbb, és csak önálló szóként (a 'ma' ne illeszkedjen pl. a 'Tamás'-ban)
+                    const dayMatch = ariaLabel.match(/(?<![a-záéíóöőúüű])(tegnapelőtt|tegnap|ma)(?![a-záéíóöőúüű])/i);
                     
                     if (fullDateMatch) {
                         // Ha van teljes dátum
@@ -292,11 +521,8 @@ class SkypeReader:
                 }
                 
                 // Keressük az olvasatlan üzenet jelzőket
-                const unreadIndicators = [
-                    '.css-1dbjc4n.r-1awozwy.r-1mlx99i.r-1867qdf.r-1yadl64.r-1777fci.r-285fr0.r-s1qlax',
-                    '.css-901oao.r-jwli3a.r-1bhw0zn.r-10x49cs.r-b88u0q.r-1cwl3u0',
-                    '[role="status"]'  // Új szelektort adtunk hozzá
-                ];
+                // A szelektorok listáját és sorrendjét a hívó adja (lásd selector_stats.py)
+                const unreadIndicators = config.selectors;
                 
                 // Keressük az olvasatlan üzenet jelzőket
                 for (const selector of unreadIndicators) {
@@ -316,6 +542,7 @@ class SkypeReader:
                                 const count = parseInt(text);
                                 if (count > 0) {
                                     itemInfo.hasUnread = true;
+                                    if (!itemInfo.hits.includes(selector)) itemInfo.hits.push(selector);
                                     itemInfo.unreadCount = count;
                                     unreadCount = Math.max(unreadCount, count);
                                     
@@ -341,25 +568,41 @@ class SkypeReader:
                             }
                         }
                     });
+                    // Adaptív sorrendnél az első találó szelektor után nem próbáljuk a többit
+                    if (config.firstHit && itemInfo.hits.length) break;
                 }
                 
                 results.push(itemInfo);
             });
             
+            const selectorHits = {};
+            for (const itemInfo of results) {
+                for (const selector of itemInfo.hits) selectorHits[selector] = (selectorHits[selector] || 0) + 1;
+            }
+            
             return {
                 totalChats: chatItems.length,
                 unreadCount,
                 oldestUnreadDate,
-                details: results
+                details: results,
+                selectorHits
             };
         }
         """
     
     def close(self):
         print("Böngésző bezárása...")
-        self.context.close()
-        self.browser.close()
-        self.playwright.stop()
+        if self.request_filter:
+            self.request_filter.report()
+        if self.selector_stats:
+            self.selector_stats.save()
+        with metrics.phase("close"):
+            self.context.close()
+            metrics.ACTIVE_CONTEXTS.dec()
+            # Megosztott böngészőnél csak a saját kontextusunkat zárjuk
+            if self.owns_browser:
+                self.browser.close()
+                self.playwright.stop()
 
 def main():
     load_dotenv()
@@ -372,7 +615,7 @@ def main():
         return
     
     print(f"Bejelentkezés a következő fiókkal: {username}")
-    reader = SkypeReader()
+    reader = SkypeReader(request_filter=create_request_filter())
     
     if reader.login(username, password):
         print("Üzenetek statisztikáinak lekérése...")
@@ -0,0 +1,34 @@
+import pytest
+from admission import AdmissionControl, MemoryPressure, Overloaded
+
+def test_memory_pressure_rejects_new_checks_with_503():
+    over_cap = [True]
+    admission = AdmissionControl(max_pending=10, memory_check=lambda: over_cap[0], memory_retry_after=7)
+    with pytest.raises(MemoryPressure) as error:
+        admission.admit(1)
+    assert error.value.status_code == 503 and error.value.retry_after == 7
+    # Csak gyorsítótárból kiszolgált kérés (0 új ellenőrzés) átmegy
+    admission.admit(0)
+    over_cap[0] = False
+    admission.admit(1)
+    assert admission.stats()["memory_rejected"] == 1
+    assert admission.stats()["pending"] == 1
+
+def test_full_queue_rejects_with_estimated_wait():
+    admission = AdmissionControl(max_pending=3, capacity=2, initial_estimate=10.0)
+    admission.admit(3)
+    with pytest.raises(Overloaded) as error:
+        admission.admit(1)
+    assert error.value.status_code == 429
+    # 3 várakozó, 2 párhuzamos hely, 10 mp-es becslés
+    assert error.value.retry_after == 15
+    admission.release(20.0)
+    admission.admit(1)
+    stats = admission.stats()
+    assert stats["pending"] == 3 and stats["rejected"] == 1
+    assert stats["average_check_seconds"] == 12.0
+
+def test_unlimited_queue_never_rejects():
+    admission = AdmissionControl(max_pending=0)
+    admission.admit(1000)
+    assert admission.stats()["pending"] == 0
@@ -0,0 +1,50 @@
+import os
+os.environ.setdefault("SESSION_CACHE_ENABLED", "0")
+import asyncio
+import threading
+import time
+import pydantic
+import pytest
+import api
+from api import JobRequest, conditional_unread, entity_tag, etag_matches
+
+def test_job_request_needs_at_least_one_account():
+    with pytest.raises(pydantic.ValidationError):
+        JobRequest(accounts=[])
+
+def test_etag_matching():
+    assert not etag_matches(None, '"a"')
+    assert etag_matches('"b", "a"', '"a"')
+    assert etag_matches('W/"a"', '"a"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"b"', '"a"')
+
+def test_long_poll_ignores_wakeups_without_a_change(monkeypatch):
+    monkeypatch.setattr(api, "changes", api.ChangeNotifier())
+    state = {"unread_messages": 1}
+    etag = entity_tag(dict(state))
+
+    def publisher():
+        # Első publish változatlan értékkel (pl. indulás után), majd a valódi változás
+        time.sleep(0.1)
+        api.changes.publish("a@example.com", dict(state))
+        time.sleep(0.3)
+        state["unread_messages"] = 2
+        api.changes.publish("a@example.com", dict(state))
+
+    async def poll():
+        threading.Thread(target=publisher, daemon=True).start()
+        started = time.monotonic()
+        response = await conditional_unread(["a@example.com"], lambda: dict(state), etag, 5)
+        return response, time.monotonic() - started
+
+    response, elapsed = asyncio.run(poll())
+    assert response.status_code == 200
+    assert 0.3 < elapsed < 4
+    assert response.headers["ETag"] == entity_tag({"unread_messages": 2})
+
+def test_long_poll_times_out_with_304(monkeypatch):
+    monkeypatch.setattr(api, "changes", api.ChangeNotifier())
+    state = {"unread_messages": 1}
+    response = asyncio.run(conditional_unread(["a@example.com"], lambda: dict(state), entity_tag(state), 0.2))
+    assert response.status_code == 304
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+from change_notifier import ChangeNotifier
+
+def test_publish_from_another_thread_wakes_the_subscriber():
+    changes = ChangeNotifier()
+
+    async def wait():
+        subscription = changes.subscribe(["a@example.com"])
+        threading.Timer(0.05, changes.publish, ("a@example.com", 1)).start()
+        try:
+            return await subscription.wait(5)
+        finally:
+            changes.unsubscribe(subscription)
+
+    assert asyncio.run(wait())
+    assert changes.stats() == {"waiting": 0, "notified": 1}
+
+def test_unchanged_fingerprint_does_not_wake():
+    changes = ChangeNotifier()
+    assert changes.publish("a@example.com", 1)
+
+    async def wait():
+        subscription = changes.subscribe(["a@example.com"])
+        assert not changes.publish("a@example.com", 1)
+        return await subscription.wait(0.1)
+
+    assert not asyncio.run(wait())
+    assert changes.stats()["notified"] == 0
+
+def test_reset_subscription_waits_for_the_next_change():
+    changes = ChangeNotifier()
+
+    async def wait():
+        subscription = changes.subscribe(["a@example.com"])
+        changes.publish("a@example.com", 1)
+        assert await subscription.wait(1)
+        subscription.reset()
+        assert not await subscription.wait(0.1)
+        changes.forget("a@example.com")
+        return await subscription.wait(1)
+
+    assert asyncio.run(wait())
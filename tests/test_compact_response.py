@@ -0,0 +1,54 @@
+from datetime import datetime
+import json
+import msgpack
+from types import SimpleNamespace
+import compact_response
+from compact_response import COLUMNAR, MSGPACK, negotiate
+from conversation_details import conversation_rows, parse_date
+
+NOW = datetime(2024, 2, 24, 15, 0)
+
+def test_negotiate_picks_the_highest_weighted_compact_type():
+    assert negotiate(None) is None
+    assert negotiate("application/json") is None
+    assert negotiate("application/x-msgpack") == MSGPACK
+    assert negotiate(f"{MSGPACK};q=0.5, {COLUMNAR};q=0.9") == COLUMNAR
+    assert negotiate(f"{COLUMNAR};q=0, application/json") is None
+    assert negotiate(f"{COLUMNAR};q=abc") is None
+
+def test_relative_days_are_not_confused():
+    assert parse_date("Anna, tegnapelőtt 10:15", NOW).date() == datetime(2024, 2, 22).date()
+    assert parse_date("Béla, Tegnap 09:00", NOW).date() == datetime(2024, 2, 23).date()
+    assert parse_date("Kati, ma 11:00", NOW).date() == NOW.date()
+    # A 'ma' szórészlet (Tamás) nem relatív nap
+    assert parse_date("Tamás, 08:30", NOW).replace(tzinfo=None) == datetime(2024, 2, 24, 8, 30)
+
+def test_full_and_invalid_dates():
+    assert parse_date("2024.02.01. 7:05", NOW).replace(tzinfo=None) == datetime(2024, 2, 1, 7, 5)
+    assert parse_date("2024.02.30. 7:05", NOW) is None
+    assert parse_date("nincs dátum", NOW) is None
+    assert parse_date(None, NOW) is None
+
+def test_conversation_rows_from_compact_and_full_scans():
+    ms = int(datetime(2024, 2, 24, 10, 30).astimezone().timestamp() * 1000)
+    assert conversation_rows({"items": [[7, 2, ms]]}) == [("7", 2, datetime(2024, 2, 24, 10, 30).astimezone().isoformat())]
+    assert conversation_rows({"details": [{"index": 0, "unreadCount": None, "date": None}]}) == [("0", 0, None)]
+    assert conversation_rows({"totalChats": 3}) is None
+
+def test_columnar_shares_keys_and_links_conversations(monkeypatch):
+    monkeypatch.setattr(compact_response, "iso_from_text", lambda text: "iso:" + text if text else None)
+    results = [
+        SimpleNamespace(
+            model_dump=lambda: {"email": "a@example.com", "unread_messages": 2, "oldest_unread_date": "2024.02.24. 10:30"},
+            conversations=[("c1", 2, "t1"), ("c2", 0, None)]
+        ),
+        SimpleNamespace(
+            model_dump=lambda: {"email": "b@example.com", "unread_messages": 0, "oldest_unread_date": None},
+            conversations=None
+        )
+    ]
+    data = json.loads(compact_response.render(results, COLUMNAR))
+    assert data["accounts"]["email"] == ["a@example.com", "b@example.com"]
+    assert data["accounts"]["oldest_unread_at"] == ["iso:2024.02.24. 10:30", None]
+    assert data["conversations"] == {"account": [0, 0], "id": ["c1", "c2"], "unread": [2, 0], "last_message": ["t1", None]}
+    assert msgpack.unpackb(compact_response.render(results, MSGPACK)) == data
@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+import pytest
+import deadline as deadline_module
+from deadline import Deadline, DeadlineExceeded
+
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(deadline_module, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+def test_no_deadline_never_expires_or_caps():
+    deadline = Deadline.after(0)
+    assert deadline.remaining() is None
+    assert not deadline.expired()
+    assert deadline.cap(60) == 60
+
+def test_cap_uses_the_remaining_time(monkeypatch):
+    now = clock(monkeypatch)
+    deadline = Deadline.after(10)
+    assert deadline.cap(60) == 10
+    assert deadline.cap(5) == 5
+    now[0] += 4
+    assert deadline.cap_ms(60) == 6000
+    assert deadline.remaining() == 6
+
+def test_expired_deadline_raises_instead_of_a_zero_timeout(monkeypatch):
+    now = clock(monkeypatch)
+    deadline = Deadline.after(1)
+    now[0] += 2
+    assert deadline.expired() and deadline.remaining() == 0
+    # A Playwright a 0 időkorlátot végtelennek venné
+    with pytest.raises(DeadlineExceeded):
+        deadline.cap(60)
@@ -0,0 +1,56 @@
+import os
+import time
+from types import SimpleNamespace
+import history_store
+from history_store import HistoryStore
+
+def stats(unread, error=None):
+    return SimpleNamespace(total_messages=10, unread_messages=unread, oldest_unread_date=None, error=error)
+
+def fake_clock(monkeypatch, start=100000.0):
+    now = [start]
+    monkeypatch.setattr(history_store, "time", SimpleNamespace(time=lambda: now[0], monotonic=time.monotonic))
+    return now
+
+def filled_store(tmp_path, monkeypatch, samples, **options):
+    # samples: (időpont, olvasatlan, hiba) hármasok; a close() kiírja a sorban maradtakat
+    now = fake_clock(monkeypatch)
+    store = HistoryStore(os.path.join(tmp_path, "history.db"), flush_interval=0.05, **options)
+    start = now[0]
+    for offset, unread, error in samples:
+        now[0] = start + offset
+        store.record("A@example.com", stats(unread, error))
+    store.close()
+    return store, start
+
+def test_history_is_bucketed_by_the_last_snapshot(tmp_path, monkeypatch):
+    store, start = filled_store(tmp_path, monkeypatch, [(0, 4, None), (10, 2, None), (20, 0, "hiba"), (70, 5, None)])
+    history = store.history("a@example.com", since=start, until=start + 120, bucket=60)
+    assert [(point["taken_at"] - start, point["unread_messages"], point["max_unread_messages"],
+             point["avg_unread_messages"], point["samples"]) for point in history["points"]] == [
+        (10, 2, 4, 3.0, 2),
+        (70, 5, 5, 5.0, 1)
+    ]
+    latest = store.latest()
+    assert len(latest) == 1 and latest[0]["unread_messages"] == 5
+    assert store.stats()["written"] == 4
+
+def test_maintenance_compacts_old_rows_and_expires_beyond_retention(tmp_path, monkeypatch):
+    store, start = filled_store(
+        tmp_path, monkeypatch,
+        [(0, 1, None), (10, 2, None), (20, 3, None), (4000, 4, None), (4010, 5, None)],
+        retention=10000, compact_after=1000, compact_bucket=3600, maintenance_interval=3600
+    )
+    history_store.time.time = lambda: start + 5000
+    connection = store._connect()
+    store._maintain(connection)
+    rows = connection.execute("SELECT taken_at - ?, unread_messages FROM snapshots ORDER BY taken_at", (start,)).fetchall()
+    # A compact_after-nél régebbi sorokból időablakonként csak az utolsó marad, az újabbak mind
+    assert rows == [(20.0, 3), (4000.0, 4), (4010.0, 5)]
+    assert store.stats()["compacted"] == 2
+
+    history_store.time.time = lambda: start + 20000
+    store._maintain(connection)
+    assert connection.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 0
+    assert store.latest() == []
+    connection.close()
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+from jobs import JobStore, JobStoreFull, describe
+import pytest
+
+def result(unread):
+    return SimpleNamespace(model_dump=lambda: {"unread_messages": unread})
+
+def test_job_finishes_when_every_account_has_a_result():
+    store = JobStore()
+    job = store.create(["a@example.com", "b@example.com"])
+    store.set_result(job, 1, result(2))
+    assert job.status == "running"
+    store.set_result(job, 0, result(0))
+    assert job.status == "done"
+    assert describe(job)["results"] == [{"unread_messages": 0}, {"unread_messages": 2}]
+
+def test_empty_job_is_done_and_evicted():
+    store = JobStore(max_jobs=2, ttl=0)
+    empty = store.create([])
+    assert empty.status == "done"
+    running = store.create(["a@example.com"])
+    # A befejezett üres feladat helyet ad, a futó megmarad
+    store.create(["b@example.com"])
+    assert store.get(empty.id) is None
+    assert store.get(running.id) is running
+
+def test_store_full_of_running_jobs_rejects_new_ones():
+    store = JobStore(max_jobs=1)
+    store.create(["a@example.com"])
+    with pytest.raises(JobStoreFull):
+        store.create(["b@example.com"])
+
+def test_deadline_closes_unfinished_accounts_and_ignores_late_results():
+    store = JobStore()
+    job = store.create(["a@example.com", "b@example.com"])
+    store.set_result(job, 0, result(1))
+    store.expire_after(job, 0.05, lambda index: result(None))
+    job.timer.join(timeout=5)
+    assert job.status == "done"
+    store.set_result(job, 1, result(7))
+    assert describe(job)["results"] == [{"unread_messages": 1}, {"unread_messages": None}]
+    assert job.completed == 2
@@ -0,0 +1,71 @@
+import json
+import os
+import network_capture
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "conversations_redacted.json")
+
+class FakeResponse:
+    def __init__(self, url, body):
+        self.url = url
+        self.status = 200
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+class FakeRoute:
+    def fulfill(self, status, content_type, body):
+        self.body = body
+
+class FakePage:
+    # A Playwright oldal helyett: a beszélgetés-kérést a visszajátszó útvonal szolgálja ki,
+    # a választ pedig a figyelőknek továbbítjuk, mint a böngésző
+    def __init__(self):
+        self.handlers = []
+        self.routes = []
+        self.login_form = False
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    def request(self, url):
+        for pattern, handler in self.routes:
+            if pattern.search(url):
+                route = FakeRoute()
+                handler(route)
+                for on_response in self.handlers:
+                    on_response(FakeResponse(url, route.body))
+
+    def query_selector(self, selector):
+        return self.login_form or None
+
+    def wait_for_timeout(self, ms):
+        pass
+
+def test_replayed_fixture_is_counted_and_signals_readiness(monkeypatch):
+    monkeypatch.setenv("NETWORK_REPLAY_FILES", FIXTURE)
+    page = FakePage()
+    collector = network_capture.attach(page)
+    assert collector.wait_for_response(page, timeout=0.05) is None
+
+    page.request("https://client-s.gateway.messenger.live.com/v1/users/ME/conversations?pageSize=100")
+    assert collector.wait_for_response(page, timeout=1, selector='input[name="loginfmt"]') == "response"
+
+    stats = collector.stats()
+    assert stats["totalChats"] == 3
+    assert stats["unreadCount"] == 3
+    assert {item[0]: item[1] for item in stats["items"]} == {
+        "8:live:.cid.0000000000000001": 3,
+        "19:0000000000000000000000000000000a@thread.v2": 1,
+        "8:live:.cid.0000000000000002": 0
+    }
+    assert stats["oldestUnreadDate"]["text"] == network_capture.format_time(1708684200456)
+
+def test_login_form_ends_the_wait_without_a_response():
+    page = FakePage()
+    page.login_form = True
+    collector = network_capture.ConversationCollector().attach(page)
+    assert collector.wait_for_response(page, timeout=1, selector='input[name="loginfmt"]') == "selector"
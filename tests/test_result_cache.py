@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+import result_cache
+from result_cache import ResultCache
+
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+def test_fresh_then_stale_then_expired(monkeypatch):
+    now = clock(monkeypatch)
+    cache = ResultCache(ttl=60, stale_ttl=30)
+    cache.put("fiok", "eredmeny")
+    now[0] += 10
+    assert cache.get("fiok") == ("eredmeny", 10.0, "cached")
+    now[0] += 60
+    assert cache.get("fiok") == ("eredmeny", 70.0, "stale")
+    now[0] += 30
+    assert cache.get("fiok") is None
+    assert cache.stats()["entries"] == 0
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    clock(monkeypatch)
+    cache = ResultCache(ttl=60, max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a")[0] == 1 and cache.get("c")[0] == 3
+
+def test_only_one_background_refresh_per_key():
+    cache = ResultCache()
+    assert cache.begin_refresh("fiok")
+    assert not cache.begin_refresh("fiok")
+    cache.end_refresh("fiok")
+    assert cache.begin_refresh("fiok")
+
+def test_zero_ttl_disables_the_cache(monkeypatch):
+    monkeypatch.setenv("RESULT_CACHE_TTL", "0")
+    assert result_cache.create_result_cache() is None
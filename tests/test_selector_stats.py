@@ -0,0 +1,34 @@
+import os
+from selector_stats import SelectorStats
+
+SELECTORS = ["[data-main]", "[data-backup]"]
+
+def trained(tmp_path, **options):
+    stats = SelectorStats(os.path.join(tmp_path, "stats.json"), dead_after=2, probe_every=5, **options)
+    for _ in range(3):
+        stats.plan(SELECTORS)
+        stats.record({"[data-main]": 4})
+    return stats
+
+def test_default_only_reorders(tmp_path):
+    stats = trained(tmp_path)
+    for _ in range(10):
+        assert stats.plan(["[data-backup]", "[data-main]"]) == (SELECTORS, True)
+
+def test_skip_dead_is_opt_in_and_still_probes(tmp_path):
+    stats = trained(tmp_path, skip_dead=True)
+    plans = [stats.plan(SELECTORS) for _ in range(5)]
+    assert plans.count((["[data-main]"], False)) == 4
+    assert (SELECTORS, True) in plans
+
+def test_every_matching_selector_keeps_a_backup_alive(tmp_path):
+    stats = trained(tmp_path, skip_dead=True)
+    stats.record({"[data-main]": 4, "[data-backup]": 1})
+    assert stats.plan(SELECTORS)[0] == SELECTORS
+
+def test_saved_stats_are_reloaded(tmp_path):
+    stats = trained(tmp_path)
+    stats.save()
+    reloaded = SelectorStats(stats.path)
+    assert reloaded.stats()["selectors"][0]["selector"] == "[data-main]"
+    assert reloaded.stats()["productive_scans"] == 3
@@ -0,0 +1,49 @@
+import os
+import threading
+from cryptography.fernet import Fernet
+from session_store import SessionStore
+
+def test_key_is_generated_once_outside_the_session_directory(tmp_path, capsys):
+    key_path = os.path.join(tmp_path, "keys", "session.key")
+    first = SessionStore(os.path.join(tmp_path, "sessions"), key_path=key_path)
+    first.save("a@example.com", "jelszo", {"cookies": []})
+    assert "új kulcs generálva" in capsys.readouterr().out
+
+    second = SessionStore(os.path.join(tmp_path, "sessions"), key_path=key_path)
+    assert capsys.readouterr().out == ""
+    assert second.load("a@example.com", "jelszo") == {"cookies": []}
+    assert second.load("a@example.com", "masik") is None
+    assert os.listdir(os.path.join(tmp_path, "sessions")) != [".key"]
+
+def test_legacy_key_is_moved_and_sessions_survive(tmp_path):
+    directory = os.path.join(tmp_path, "sessions")
+    key = Fernet.generate_key()
+    legacy = SessionStore(directory, key=key)
+    with open(os.path.join(directory, ".key"), "wb") as f:
+        f.write(key)
+    legacy.save("a@example.com", "jelszo", {"cookies": [1]})
+
+    key_path = os.path.join(tmp_path, "session.key")
+    migrated = SessionStore(directory, key_path=key_path)
+    assert not os.path.exists(os.path.join(directory, ".key"))
+    assert os.path.exists(key_path)
+    assert migrated.load("a@example.com", "jelszo") == {"cookies": [1]}
+
+def test_concurrent_starts_agree_on_one_key(tmp_path):
+    key_path = os.path.join(tmp_path, "session.key")
+    stores, errors = [], []
+
+    def start(index):
+        try:
+            stores.append(SessionStore(os.path.join(tmp_path, f"sessions{index}"), key_path=key_path))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=start, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    token = stores[0].fernet.encrypt(b"x")
+    assert all(store.fernet.decrypt(token) == b"x" for store in stores)
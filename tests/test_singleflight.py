@@ -0,0 +1,45 @@
+from concurrent.futures import Future
+from singleflight import SingleFlight
+
+def starter():
+    started = []
+
+    def start():
+        started.append(Future())
+        return started[-1]
+
+    return started, start
+
+def test_callers_with_no_later_deadline_share_the_running_call():
+    flight = SingleFlight()
+    started, start = starter()
+    first, shared = flight.do("fiok", start, 100.0)
+    assert not shared
+    assert flight.do("fiok", start, 50.0) == (first, True)
+    first.set_result("kesz")
+    assert flight.stats() == {"in_flight": 0, "started": 1, "joined": 1, "queued": 0}
+
+def test_later_deadline_reuses_a_usable_result_without_a_second_call():
+    flight = SingleFlight()
+    started, start = starter()
+    first, _ = flight.do("fiok", start, 100.0, usable=lambda value: value != "lejart")
+    follow, shared = flight.do("fiok", start, usable=lambda value: value != "lejart")
+    assert shared and follow is not first
+    first.set_result("kesz")
+    assert follow.result(timeout=1) == "kesz"
+    assert len(started) == 1
+
+def test_later_deadline_runs_again_after_an_expired_call():
+    flight = SingleFlight()
+    started, start = starter()
+    usable = lambda value: value != "lejart"
+    first, _ = flight.do("fiok", start, 100.0, usable)
+    follow, _ = flight.do("fiok", start, 200.0, usable)
+    # Amíg az első fut, nincs második bejelentkezés
+    assert len(started) == 1
+    first.set_result("lejart")
+    assert len(started) == 2 and not follow.done()
+    # Az új hívás a későbbi határidővel fut, az ilyen hívók már ahhoz csatlakoznak
+    assert flight.do("fiok", start, 150.0) == (started[1], True)
+    started[1].set_result("kesz")
+    assert follow.result(timeout=1) == "kesz"
@@ -0,0 +1,86 @@
+from concurrent.futures import Future
+import time
+import pytest
+from worker_pool import WorkerPool
+
+class InlinePool:
+    # A BrowserPool helyett: a feladat azonnal lefut, böngésző nélkül
+    def submit(self, func):
+        future = Future()
+        future.set_result(func(None))
+        return future
+
+    def ready(self):
+        return True
+
+    def stats(self):
+        return {}
+
+    def shutdown(self):
+        pass
+
+def init_inline(index):
+    return InlinePool()
+
+def echo(browser, payload):
+    # "lassu:<mp>:<érték>" alakú feladat a megadott ideig fut
+    if payload.startswith("lassu:"):
+        _, seconds, payload = payload.split(":", 2)
+        time.sleep(float(seconds))
+    return payload
+
+def wait_until(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return False
+
+def test_task_submitted_while_all_workers_are_down_runs_after_restart():
+    pool = WorkerPool(2, init_inline, echo, restart_backoff=0.5)
+    pool.start()
+    try:
+        assert wait_until(pool.ready)
+        assert pool.submit("elso", "a@example.com").result(timeout=30) == "elso"
+
+        for worker in pool.workers:
+            worker.process.kill()
+        assert wait_until(lambda: not any(worker["alive"] for worker in pool.stats()["workers"]))
+
+        future = pool.submit("masodik", "a@example.com")
+        assert future.result(timeout=30) == "masodik"
+        assert all(worker["pending"] == 0 for worker in pool.stats()["workers"])
+    finally:
+        pool.shutdown()
+
+def kill_worker_running(pool, key):
+    worker = pool.route(key)
+    assert wait_until(lambda: worker.pending)
+    worker.process.kill()
+    return worker
+
+def test_task_of_a_crashed_worker_moves_to_a_live_one():
+    pool = WorkerPool(2, init_inline, echo, restart_backoff=30, max_attempts=2)
+    pool.start()
+    try:
+        assert wait_until(pool.ready)
+        future = pool.submit("lassu:5:kesz", "a@example.com")
+        crashed = kill_worker_running(pool, "a@example.com")
+        assert future.result(timeout=30) == "kesz"
+        assert not crashed.alive
+        assert all(worker["pending"] == 0 for worker in pool.stats()["workers"])
+    finally:
+        pool.shutdown()
+
+def test_crashed_attempt_counts_towards_max_attempts():
+    pool = WorkerPool(2, init_inline, echo, restart_backoff=30, max_attempts=1)
+    pool.start()
+    try:
+        assert wait_until(pool.ready)
+        future = pool.submit("lassu:5:kesz", "a@example.com")
+        kill_worker_running(pool, "a@example.com")
+        with pytest.raises(RuntimeError):
+            future.result(timeout=30)
+    finally:
+        pool.shutdown()
@@ -0,0 +1,191 @@
+# Az oldalba injektált követő: beszélgetésenkénti olvasatlan-indexet tart fenn,
+# amit a chat lista DOM változásai (MutationObserver) alapján csak a módosult
+# elemekre számol újra. Pythonból a pillanatnyi összesítés olcsón, újratöltés
+# és teljes újraszkennelés nélkül kiolvasható.
+
+# Egy chat elem elemzése; ugyanazokat a szabályokat követi, mint a teljes szkennelés
+ANALYSE_ITEM_JS = """
+const parseItemDate = (ariaLabel) => {
+    if (!ariaLabel) return null;
+    const fullDateMatch = ariaLabel.match(/(\\d{4}\\.\\d{2}\\.\\d{2}\\.)/);
+    const timeMatch = ariaLabel.match(/(\\d{1,2}:\\d{2})/);
+    // A hosszabb alak előbb, és csak önálló szóként (a 'ma' ne illeszkedjen pl. a 'Tamás'-ban)
+    const dayMatch = ariaLabel.match(/(?<![a-záéíóöőúüű])(tegnapelőtt|tegnap|ma)(?![a-záéíóöőúüű])/i);
+    const format = (date, time) => {
+        const month = String(date.getMonth() + 1).padStart(2, '0');
+        const day = String(date.getDate()).padStart(2, '0');
+        return `${date.getFullYear()}.${month}.${day}. ${time}`;
+    };
+
+    if (fullDateMatch) {
+        const [year, month, day] = fullDateMatch[1].split('.').map(Number);
+        const date = new Date(year, month - 1, day);
+        if (timeMatch) {
+            const [hours, minutes] = timeMatch[1].split(':').map(Number);
+            date.setHours(hours, minutes, 0, 0);
+            return { text: `${fullDateMatch[1]} ${timeMatch[1]}`, ts: date.getTime() };
+        }
+        return { text: fullDateMatch[1], ts: date.getTime() };
+    }
+    if (timeMatch) {
+        // Relatív nap (ma/tegnap/tegnapelőtt), vagy ha nincs, mai nap
+        const date = new Date();
+        const [hours, minutes] = timeMatch[1].split(':').map(Number);
+        if (dayMatch) {
+            const offset = { 'tegnap': 1, 'tegnapelőtt': 2 }[dayMatch[1].toLowerCase()] || 0;
+            date.setDate(date.getDate() - offset);
+        }
+        date.setHours(hours, minutes, 0, 0);
+        return { text: format(date, timeMatch[1]), ts: date.getTime() };
+    }
+    return null;
+};
+
+const analyseItem = (item, config) => {
+    // hits: az összes szelektor, amelyik jelzőt talált (a szelektor statisztikához)
+    const info = { unreadCount: 0, date: parseItemDate(item.getAttribute('aria-label')), hits: [] };
+    for (const selector of config.selectors) {
+        for (const indicator of item.querySelectorAll(selector)) {
+            const style = window.getComputedStyle(indicator);
+            if (style.display === 'none' || style.visibility === 'hidden' ||
+                style.opacity === '0' || indicator.offsetParent === null) {
+                continue;
+            }
+            // Engedékeny módban a '5+' jellegű számokat és a szöveges jelzőket is elfogadjuk
+            const text = indicator.textContent.trim();
+            const count = config.lenient || /^\\d+$/.test(text) ? parseInt(text) : NaN;
+            if (!isNaN(count) && count > 0) {
+                info.unreadCount = count;
+            } else if (config.lenient && text &&
+                       (text.toLowerCase().includes('olvasatlan') || text.toLowerCase().includes('unread'))) {
+                info.unreadCount = Math.max(info.unreadCount, 1);
+            } else {
+                continue;
+            }
+            if (!info.hits.includes(selector)) info.hits.push(selector);
+        }
+        // Adaptív sorrendnél az első találó szelektor után nem próbáljuk a többit
+        if (config.firstHit && info.hits.length) break;
+    }
+    return info;
+};
+
+// Szelektoronként hány elemen talált
+const countHits = (infos) => {
+    const hits = {};
+    for (const info of infos) {
+        for (const selector of info.hits) hits[selector] = (hits[selector] || 0) + 1;
+    }
+    return hits;
+};
+"""
+
+INSTALL_TRACKER_JS = """
+(config) => {
+    if (window.__skypeUnreadTracker) {
+        return window.__skypeUnreadTracker.snapshot();
+    }
+    """ + ANALYSE_ITEM_JS + """
+    const ITEM_SELECTOR = 'div[role="listitem"]';
+    const index = new Map();
+    const dirty = new Set();
+    let updates = 0;
+    let scheduled = false;
+
+    const flush = () => {
+        scheduled = false;
+        for (const item of dirty) {
+            if (item.isConnected) {
+                index.set(item, analyseItem(item, config));
+            } else {
+                index.delete(item);
+            }
+            updates++;
+        }
+        dirty.clear();
+    };
+
+    const markNode = (node) => {
+        if (node.nodeType !== Node.ELEMENT_NODE) {
+            node = node.parentElement;
+            if (!node) return;
+        }
+        const item = node.closest(ITEM_SELECTOR);
+        if (item) dirty.add(item);
+        if (node.querySelectorAll) {
+            for (const child of node.querySelectorAll(ITEM_SELECTOR)) dirty.add(child);
+        }
+    };
+
+    const observer = new MutationObserver((mutations) => {
+        for (const mutation of mutations) {
+            markNode(mutation.target);
+            for (const node of mutation.addedNodes) markNode(node);
+            for (const node of mutation.removedNodes) {
+                if (node.nodeType !== Node.ELEMENT_NODE) continue;
+                if (node.matches(ITEM_SELECTOR)) dirty.add(node);
+                for (const child of node.querySelectorAll(ITEM_SELECTOR)) dirty.add(child);
+            }
+        }
+        if (dirty.size && !scheduled) {
+            scheduled = true;
+            requestAnimationFrame(flush);
+        }
+    });
+    observer.observe(document.body, {
+        childList: true,
+        subtree: true,
+        characterData: true,
+        attributes: true,
+        attributeFilter: ['aria-label', 'class', 'style']
+    });
+
+    // Kezdeti feltöltés egyetlen teljes bejárással
+    for (const item of document.querySelectorAll(ITEM_SELECTOR)) dirty.add(item);
+    flush();
+
+    window.__skypeUnreadTracker = {
+        snapshot: () => {
+            // Függőben lévő változások feldolgozása, hogy a kiolvasás naprakész legyen
+            if (dirty.size) flush();
+            let unreadCount = 0;
+            let oldest = null;
+            const items = [];
+            for (const [item, info] of index) {
+                if (!item.isConnected) {
+                    index.delete(item);
+                    continue;
+                }
+                // Csak stabil azonosítóval: a sorszám két változás között mást jelölhet
+                const id = item.getAttribute('data-id') || item.id;
+                if (id) items.push([id, info.unreadCount, info.date ? info.date.ts : null]);
+                if (info.unreadCount <= 0) continue;
+                unreadCount = Math.max(unreadCount, info.unreadCount);
+                if (info.date && (!oldest || info.date.ts < oldest.ts)) oldest = info.date;
+            }
+            return {
+                totalChats: index.size,
+                unreadCount,
+                oldestUnreadDate: oldest ? { text: oldest.text, fullDate: new Date(oldest.ts) } : null,
+                items,
+                exact: items.length === index.size,
+                updates,
+                selectorHits: countHits(index.values())
+            };
+        },
+        disconnect: () => observer.disconnect()
+    };
+    return window.__skypeUnreadTracker.snapshot();
+}
+"""
+
+READ_TRACKER_JS = """
+() => window.__skypeUnreadTracker ? window.__skypeUnreadTracker.snapshot() : null
+"""
+
+def install(page, selectors, lenient=False, first_hit=False):
+    return page.evaluate(INSTALL_TRACKER_JS, {"selectors": selectors, "lenient": lenient, "firstHit": first_hit})
+
+def read(page):
+    # None, ha az oldal újratöltődött, és a követő már nem él
+    return page.evaluate(READ_TRACKER_JS)
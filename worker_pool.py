@@ -0,0 +1,279 @@
+from concurrent.futures import Future
+from prometheus_client import multiprocess
+from multiprocessing.connection import wait
+import hashlib
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+
+STATUS_INTERVAL = 2.0
+
+def run_worker(index, initializer, task, tasks, results):
+    # A munkafolyamat belépési pontja: saját böngészőkészlet, a feladatok a
+    # készlet szálain futnak, az eredmények a folyamat saját csövén mennek vissza.
+    # (Közös eredménysor helyett: annak írási zárja egy írás közben leölt
+    # folyamattal együtt foglalt maradna, és minden más folyamat elakadna.)
+    results_lock = threading.Lock()
+
+    def put(message):
+        with results_lock:
+            results.send(message)
+
+    try:
+        pool = initializer(index)
+    except Exception as e:
+        put(("failed", index, str(e)))
+        return
+
+    stopped = threading.Event()
+
+    def report_status():
+        while not stopped.is_set():
+            put(("status", index, pool.ready(), pool.stats()))
+            stopped.wait(STATUS_INTERVAL)
+
+    threading.Thread(target=report_status, name="worker-status", daemon=True).start()
+
+    def send(task_id, future):
+        try:
+            put(("result", task_id, future.result(), None))
+        except Exception as e:
+            put(("result", task_id, None, str(e)))
+
+    try:
+        while True:
+            message = tasks.get()
+            if message is None:
+                break
+            task_id, payload = message
+            future = pool.submit(lambda browser, payload=payload: task(browser, payload))
+            future.add_done_callback(lambda future, task_id=task_id: send(task_id, future))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopped.set()
+        pool.shutdown()
+
+class WorkerProcess:
+    def __init__(self, index):
+        self.index = index
+        self.process = None
+        self.tasks = None
+        self.results = None
+        self.alive = False
+        self.ready = False
+        self.stats = {}
+        self.pending = {}
+        self.restarts = 0
+        self.next_restart = 0.0
+
+class WorkerPool:
+    # Több munkafolyamat, mindegyikben egy BrowserPool. Egy fiók mindig ugyanahhoz
+    # a folyamathoz kerül (rendezvous hash), így a tartalék oldalak és a munkamenetek
+    # ott maradnak; kieső folyamat fiókjai a következő élő folyamathoz mennek át,
+    # amíg a felügyelő újra nem indítja.
+    def __init__(self, processes, initializer, task, restart_backoff=5, max_attempts=2):
+        self.context = multiprocessing.get_context("spawn")
+        self.initializer = initializer
+        self.task = task
+        self.restart_backoff = restart_backoff
+        self.max_attempts = max_attempts
+        self.workers = [WorkerProcess(index) for index in range(max(1, processes))]
+        self.lock = threading.Lock()
+        self.task_ids = itertools.count()
+        self.stopping = False
+        self.threads = []
+        self.retired = []
+
+    @property
+    def size(self):
+        return len(self.workers)
+
+    def start(self):
+        for worker in self.workers:
+            self._spawn(worker)
+        for target, name in ((self._collect, "worker-results"), (self._supervise, "worker-supervisor")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        print(f"Munkafolyamatok elindítva ({self.size} folyamat)")
+
+    def _spawn(self, worker):
+        worker.tasks = self.context.Queue()
+        # Ha minden folyamat leállt, a feladatok a leállt folyamatnál várnak; az új sor megkapja őket
+        for task_id, (payload, _, _, _) in worker.pending.items():
+            worker.tasks.put((task_id, payload))
+        if worker.results:
+            # A régi csövet a gyűjtő szál zárja le, amelyik esetleg épp várakozik rajta
+            self.retired.append(worker.results)
+        worker.results, results = self.context.Pipe(duplex=False)
+        worker.process = self.context.Process(
+            target=run_worker,
+            args=(worker.index, self.initializer, self.task, worker.tasks, results),
+            name=f"skype-worker-{worker.index}",
+            daemon=True
+        )
+        worker.process.start()
+        # Csak a folyamatnál marad írható vég, így a leállása EOF-ot ad
+        results.close()
+        worker.alive = True
+        worker.ready = False
+
+    def route(self, key):
+        with self.lock:
+            return self._route(key)
+
+    def _route(self, key):
+        live = [worker for worker in self.workers if worker.alive] or self.workers
+        return max(live, key=lambda worker: hashlib.sha256(f"{worker.index}:{key}".encode('utf-8')).digest())
+
+    def submit(self, payload, key):
+        # A key alapján választott folyamatnak küldi; a Future a folyamat eredményét kapja
+        future = Future()
+        with self.lock:
+            self._send(next(self.task_ids), payload, key, future, 1)
+        return future
+
+    def _send(self, task_id, payload, key, future, attempt):
+        worker = self._route(key)
+        worker.pending[task_id] = (payload, key, future, attempt)
+        if worker.alive:
+            worker.tasks.put((task_id, payload))
+
+    def _collect(self):
+        while True:
+            with self.lock:
+                connections = {worker.results: worker for worker in self.workers if worker.results}
+                retired, self.retired = self.retired, []
+            for connection in retired:
+                connection.close()
+            if self.stopping and not connections:
+                break
+            for connection in wait(list(connections), timeout=0.5):
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    # A folyamat leállt; az újraindítást és a feladatait a felügyelő intézi
+                    with self.lock:
+                        worker = connections[connection]
+                        if worker.results is connection:
+                            worker.results = None
+                    connection.close()
+                    continue
+                self._handle_message(message)
+
+    def _handle_message(self, message):
+        kind, index = message[0], message[1]
+        with self.lock:
+            if kind == "result":
+                _, task_id, value, error = message
+                entry = None
+                for worker in self.workers:
+                    entry = worker.pending.pop(task_id, None)
+                    if entry:
+                        break
+                if not entry:
+                    return
+                future = entry[2]
+            elif kind == "status":
+                worker = self.workers[index]
+                if worker.alive:
+                    worker.ready, worker.stats = message[2], message[3]
+                return
+            else:
+                print(f"A(z) {index}. munkafolyamat nem indult el: {message[2]}")
+                return
+        if error:
+            future.set_exception(RuntimeError(error))
+        else:
+            future.set_result(value)
+
+    def _supervise(self):
+        while not self.stopping:
+            time.sleep(1)
+            failed = []
+            with self.lock:
+                for worker in self.workers:
+                    if worker.alive and not worker.process.is_alive():
+                        failed.extend(self._handle_crash(worker))
+                    elif not worker.alive and not self.stopping and time.monotonic() >= worker.next_restart:
+                        print(f"A(z) {worker.index}. munkafolyamat újraindítása...")
+                        worker.restarts += 1
+                        self._spawn(worker)
+            for future in failed:
+                future.set_exception(RuntimeError("A munkafolyamat a feladat közben leállt"))
+
+    def _handle_crash(self, worker):
+        print(f"A(z) {worker.index}. munkafolyamat leállt (kilépési kód: {worker.process.exitcode})")
+        worker.alive = False
+        worker.ready = False
+        worker.stats = {}
+        worker.next_restart = time.monotonic() + self.restart_backoff * min(2 ** worker.restarts, 12)
+        mark_process_dead(worker.process.pid)
+        # A félbemaradt feladatok átkerülnek egy élő folyamathoz, amíg a próbálkozások száma
+        # (az épp összeomlottat is beleszámítva) el nem éri a max_attempts értéket
+        pending, worker.pending = worker.pending, {}
+        failed = []
+        for task_id, (payload, key, future, attempt) in pending.items():
+            if attempt < self.max_attempts and any(other.alive for other in self.workers):
+                self._send(task_id, payload, key, future, attempt + 1)
+            else:
+                failed.append(future)
+        return failed
+
+    def ready(self):
+        with self.lock:
+            return not self.stopping and all(worker.alive and worker.ready for worker in self.workers)
+
+    def over_memory_cap(self):
+        # A munkafolyamatok legutóbbi állapotjelentései alapján; a gépenkénti korlát a folyamatok között oszlik meg
+        with self.lock:
+            resources = [worker.stats.get("resources") for worker in self.workers if worker.alive]
+        resources = [resource for resource in resources if resource and resource.get("memory_cap_mb")]
+        if not resources:
+            return False
+        return sum(resource["memory_mb"] for resource in resources) > sum(resource["memory_cap_mb"] for resource in resources)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "processes": self.size,
+                "workers": [
+                    {
+                        "index": worker.index,
+                        "pid": worker.process.pid if worker.process else None,
+                        "alive": worker.alive,
+                        "ready": worker.ready,
+                        "restarts": worker.restarts,
+                        "pending": len(worker.pending),
+                        "pool": worker.stats
+                    }
+                    for worker in self.workers
+                ]
+            }
+
+    def shutdown(self):
+        self.stopping = True
+        with self.lock:
+            workers = [worker for worker in self.workers if worker.alive]
+        for worker in workers:
+            worker.tasks.put(None)
+        for worker in workers:
+            worker.process.join(timeout=30)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            mark_process_dead(worker.process.pid)
+        for thread in self.threads:
+            thread.join(timeout=5)
+        print("Munkafolyamatok leállítva")
+
+def mark_process_dead(pid):
+    # Prometheus többfolyamatos módban a leállt folyamat gauge értékei ne számítsanak tovább
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return
+    try:
+        multiprocess.mark_process_dead(pid)
+    except Exception as e:
+        print(f"Hiba a metrikák takarítása során: {str(e)}")